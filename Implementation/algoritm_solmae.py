@@ -1,6 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
 import hashing
 import rng
+from cache import LRUCache
 from poly import Poly
+from polyvec import PolyVec, PolyMatrix, cached_matrix
 from params import n, k, q, eta, d, SEED_LEN
 
 
@@ -19,8 +24,13 @@ def _poly_from_rho(rho, i, j):
     return Poly(coeffs)
 
 
+def _build_matrix_A(rho):
+    return PolyMatrix([_poly_from_rho(rho, i, j) for j in range(k)] for i in range(k))
+
+
 def _expand_matrix_A(rho):
-    return [[_poly_from_rho(rho, i, j) for j in range(k)] for i in range(k)]
+    Poly.ring(q, n)
+    return cached_matrix("solmae_A", rho, _build_matrix_A)
 
 
 def _highbits_bytes(poly_obj):
@@ -43,10 +53,7 @@ def keygen_solmae():
 
     A = _expand_matrix_A(rho)
 
-    t = [Poly.zero() for _ in range(k)]
-    for i in range(k):
-        for j in range(k):
-            t[i] = t[i] + A[i][j]._mul_poly(s[j])
+    t = A.matvec(PolyVec(s))
 
     t1, t0 = [], []
     for ti in t:
@@ -64,22 +71,11 @@ def keygen_solmae():
 
 
 
-def sign_solmae(sk, msg):
-
-    s, e, t0, tr, pk = sk
-    rho, t1 = pk
-
-    Poly.ring(q, n)
-
-    y = [Poly(hashing.H_to_small_poly(rng.random_bytes_sys(SEED_LEN), n, eta)) for _ in range(k)]
-
-    A = _expand_matrix_A(rho)
+def _sample_y():
+    return [Poly(hashing.H_to_small_poly(rng.random_bytes_sys(SEED_LEN), n, eta)) for _ in range(k)]
 
-    w = [Poly.zero() for _ in range(k)]
-    for i in range(k):
-        for j in range(k):
-            w[i] = w[i] + A[i][j]._mul_poly(y[j])
 
+def _signature_from(tr, msg, y, w):
     w1 = [_highbits_bytes(wi) for wi in w]
 
     z = [yi.a[:] for yi in y]
@@ -91,33 +87,203 @@ def sign_solmae(sk, msg):
     return z, c, w1
 
 
-def verify_solmae(pk, msg, sig):
+def _sign_with(A, tr, msg):
+    y = _sample_y()
+
+    w = A.matvec(PolyVec(y))
+
+    return _signature_from(tr, msg, y, w)
+
+
+class SigningKey:
+    def __init__(self, sk):
+        tr, pk = sk[3], sk[4]
+
+        self.sk = sk
+        self.pk = pk
+        self.tr = tr
+        self.A = _expand_matrix_A(pk[0])
+
+    def sign(self, msg):
+        Poly.ring(q, n)
+
+        return _sign_with(self.A, self.tr, msg)
+
+    def sign_many(self, msgs):
+        Poly.ring(q, n)
+
+        ys = [_sample_y() for _ in msgs]
+
+        ws = self.A.matvec_many(PolyVec(y) for y in ys)
+
+        return [_signature_from(self.tr, msg, y, w) for msg, y, w in zip(msgs, ys, ws)]
+
+
+def sign_solmae(sk, msg):
+    tr, pk = sk[3], sk[4]
+    return _sign_with(_expand_matrix_A(pk[0]), tr, msg)
+
+
+_WORKER_SIGNER = None
+
+
+def _init_sign_worker(sk):
+    global _WORKER_SIGNER
+    _WORKER_SIGNER = SigningKey(sk)
+
+
+def _sign_chunk(msgs):
+    return _WORKER_SIGNER.sign_many(msgs)
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def sign_batch(sk, messages, workers=None, chunk_size=64):
+    if chunk_size < 1:
+        raise ValueError("sign_batch: chunk_size must be >= 1")
+    out = []
+    if workers is None or workers <= 1:
+        signer = SigningKey(sk)
+        for chunk in _chunks(messages, chunk_size):
+            out.extend(signer.sign_many(chunk))
+        return out
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_sign_worker, initargs=(sk,)) as ex:
+        for sigs in ex.map(_sign_chunk, _chunks(messages, chunk_size)):
+            out.extend(sigs)
+    return out
+
+
+def _pk_bytes(pk):
     rho, t1 = pk
-    z, c, w1 = sig
+    return rho + b"".join(t1)
 
-    Poly.ring(q, n)
 
-    if not isinstance(z, list) or len(z) != k:
-        return False
-    for zi in z:
-        if not isinstance(zi, list) or len(zi) != n:
+class VerifyingKey:
+    def __init__(self, pk):
+        self.pk = pk
+        self.pk_bytes = _pk_bytes(pk)
+        self.tr = hashing.H_pk_bind(self.pk_bytes)
+
+    def verify(self, msg, sig):
+        z, c, w1 = sig
+
+        if not isinstance(z, list) or len(z) != k:
             return False
-        if any(not (0 <= int(x) < q) for x in zi):
+        for zi in z:
+            if not isinstance(zi, list) or len(zi) != n:
+                return False
+            if any(not (0 <= int(x) < q) for x in zi):
+                return False
+
+        if not isinstance(w1, list) or len(w1) != k:
             return False
+        for w1i in w1:
+            if not isinstance(w1i, (bytes, bytearray)) or len(w1i) != n:
+                return False
 
-    if not isinstance(w1, list) or len(w1) != k:
-        return False
-    for w1i in w1:
-        if not isinstance(w1i, (bytes, bytearray)) or len(w1i) != n:
+        if not isinstance(c, (bytes, bytearray)):
             return False
 
-    if not isinstance(c, (bytes, bytearray)):
-        return False
+        z_bytes = b"".join(int(x).to_bytes(2, "big") for zi in z for x in zi)
 
-    tr_check = hashing.H_pk_bind(rho + b"".join(t1))
+        c_check = hashing.H_challenge(self.tr, msg + b"".join(w1) + z_bytes, 32)
 
-    z_bytes = b"".join(int(x).to_bytes(2, "big") for zi in z for x in zi)
+        return c_check == c
+
+
+_VK_CACHE = LRUCache(capacity=32)
 
-    c_check = hashing.H_challenge(tr_check, msg + b"".join(w1) + z_bytes, 32)
 
-    return c_check == c
+def _pk_cache_key(pk):
+    rho, t1 = pk
+    return bytes(rho), tuple(bytes(t) for t in t1)
+
+
+def verifying_key_for(pk):
+    return _VK_CACHE.get_or_build(_pk_cache_key(pk), lambda: VerifyingKey(pk))
+
+
+def verifying_key_cache_info():
+    return _VK_CACHE.info()
+
+
+def verifying_key_cache_clear():
+    _VK_CACHE.clear()
+
+
+def set_verifying_key_cache_capacity(capacity):
+    _VK_CACHE.resize(capacity)
+
+
+def verify_solmae(pk, msg, sig):
+    return verifying_key_for(pk).verify(msg, sig)
+
+
+def _init_verify_worker(pks):
+    Poly.ring(q, n)
+    for pk in pks:
+        try:
+            verifying_key_for(pk)
+        except (TypeError, ValueError):
+            pass
+
+
+def _verify_group(pk, jobs):
+    try:
+        vk = verifying_key_for(pk)
+    except (TypeError, ValueError):
+        return [(idx, False) for idx, _, _ in jobs]
+    out = []
+    for idx, msg, sig in jobs:
+        try:
+            ok = vk.verify(msg, sig)
+        except (TypeError, ValueError):
+            ok = False
+        out.append((idx, ok))
+    return out
+
+
+def verify_batch(items, workers=None):
+    groups = {}
+    count = 0
+    for idx, (pk, msg, sig) in enumerate(items):
+        count = idx + 1
+        try:
+            key = _pk_cache_key(pk)
+        except (TypeError, ValueError):
+            continue
+        if key not in groups:
+            groups[key] = (pk, [])
+        groups[key][1].append((idx, msg, sig))
+
+    results = [False] * count
+    if not groups:
+        return results
+
+    if workers is None or workers <= 1:
+        for pk, jobs in groups.values():
+            for idx, ok in _verify_group(pk, jobs):
+                results[idx] = ok
+        return results
+
+    tasks = []
+    for pk, jobs in groups.values():
+        step = max(1, -(-len(jobs) // workers))
+        for start in range(0, len(jobs), step):
+            tasks.append((pk, jobs[start:start + step]))
+
+    pks = [pk for pk, _ in groups.values()][:_VK_CACHE.info().capacity]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_verify_worker, initargs=(pks,)) as ex:
+        futures = [ex.submit(_verify_group, pk, jobs) for pk, jobs in tasks]
+        for fut in futures:
+            for idx, ok in fut.result():
+                results[idx] = ok
+    return results
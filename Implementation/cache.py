@@ -0,0 +1,65 @@
+from collections import OrderedDict, namedtuple
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "size", "capacity"])
+
+
+class LRUCache:
+    def __init__(self, capacity=16):
+        if capacity < 1:
+            raise ValueError("LRUCache: capacity must be >= 1")
+        self._capacity = int(capacity)
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        self._evict()
+
+    def get_or_build(self, key, build):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = build()
+            self.put(key, value)
+            return value
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def resize(self, capacity):
+        if capacity < 1:
+            raise ValueError("LRUCache: capacity must be >= 1")
+        self._capacity = int(capacity)
+        self._evict()
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, len(self._data), self._capacity)
+
+    def _evict(self):
+        while len(self._data) > self._capacity:
+            self._data.popitem(last=False)
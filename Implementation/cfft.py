@@ -1,5 +1,16 @@
 import cmath
 import math
+from array import array
+from dataclasses import dataclass, field
+from operator import add, mul, sub
+from typing import Dict, List
+
+from cache import LRUCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def is_power_of_two(n):
@@ -32,6 +43,58 @@ def precompute_twiddles(n):
     return W, Winv
 
 
+@dataclass
+class CFFTPlan:
+    n: int
+    W: List[complex]
+    Winv: List[complex]
+    bitrev: List[int]
+    stages: List[List[complex]] = field(default_factory=list, repr=False)
+    stages_inv: List[List[complex]] = field(default_factory=list, repr=False)
+    neg_twist: List[complex] = field(default_factory=list, repr=False)
+    split_roots: List[complex] = field(default_factory=list, repr=False)
+    soa_tables: Dict[str, object] = field(default_factory=dict, repr=False, compare=False)
+
+
+_PLAN_CACHE = LRUCache(capacity=16)
+_STAGE_CACHE = LRUCache(capacity=8)
+
+
+def stage_twiddles(W):
+    n = len(W)
+    stages = []
+    length = 2
+    while length <= n:
+        stages.append(W[:n // 2:n // length])
+        length <<= 1
+    return stages
+
+
+def build_cfft_plan(n):
+    W, Winv = precompute_twiddles(n)
+    neg_twist = [cmath.exp(1j * math.pi * j / (2 * n)) for j in range(n)]
+    split_roots = [cmath.exp(1j * math.pi * (4 * m + 1) / (2 * n)) for m in range(n // 2)]
+    return CFFTPlan(n, W, Winv, bitrev_permutation(n), stage_twiddles(W), stage_twiddles(Winv),
+                    neg_twist, split_roots)
+
+
+def get_cfft_plan(n):
+    n = int(n)
+    return _PLAN_CACHE.get_or_build(n, lambda: build_cfft_plan(n))
+
+
+def cfft_plan_cache_info():
+    return _PLAN_CACHE.info()
+
+
+def cfft_plan_cache_clear():
+    _PLAN_CACHE.clear()
+
+
+def set_cfft_plan_cache_capacity(capacity):
+    _PLAN_CACHE.resize(capacity)
+
+
 def _bitrev_shuffle(a, perm):
     n = len(a)
     for i in range(n):
@@ -40,56 +103,197 @@ def _bitrev_shuffle(a, perm):
             a[i], a[j] = a[j], a[i]
 
 
-def fft_inplace(a, W, bitrev):
+def _butterflies(a, stages):
     n = len(a)
-    assert is_power_of_two(n), "fft_inplace: n must be power of two"
-    _bitrev_shuffle(a, bitrev)
-
-    length = 2
-    while length <= n:
-        half = length // 2
-        step = n // length
+    half = 1
+    for tw in stages:
+        length = 2 * half
         for start in range(0, n, length):
-            w = 1+0j
             for j in range(half):
                 u = a[start + j]
-                v = a[start + j + half] * w
+                v = a[start + j + half] * tw[j]
                 a[start + j] = u + v
                 a[start + j + half] = u - v
-                w *= W[step]
-        length <<= 1
+        half = length
 
-def ifft_inplace(A, Winv, bitrev):
-    n = len(A)
-    assert is_power_of_two(n), "ifft_inplace: n must be power of two"
-    _bitrev_shuffle(A, bitrev)
 
-    length = 2
-    while length <= n:
-        half = length // 2
-        step = n // length
+class ComplexVec:
+    __slots__ = ("re", "im")
+
+    def __init__(self, re, im):
+        assert len(re) == len(im), "ComplexVec: re/im size mismatch"
+        self.re = re
+        self.im = im
+
+    @classmethod
+    def zeros(cls, n):
+        return cls(array("d", bytes(8 * n)), array("d", bytes(8 * n)))
+
+    @classmethod
+    def from_complex(cls, values):
+        values = [complex(z) for z in values]
+        return cls(array("d", [z.real for z in values]), array("d", [z.imag for z in values]))
+
+    def to_complex(self):
+        return [complex(r, i) for r, i in zip(self.re, self.im)]
+
+    def copy(self):
+        return ComplexVec(array("d", self.re), array("d", self.im))
+
+    def __len__(self):
+        return len(self.re)
+
+    def __getitem__(self, i):
+        return complex(self.re[i], self.im[i])
+
+    def __setitem__(self, i, z):
+        self.re[i] = z.real
+        self.im[i] = z.imag
+
+    def __iter__(self):
+        return map(complex, self.re, self.im)
+
+    def __repr__(self):
+        return f"ComplexVec({self.to_complex()!r})"
+
+
+def _np_views(v):
+    return np.frombuffer(v.re, dtype=np.float64), np.frombuffer(v.im, dtype=np.float64)
+
+
+def _soa_split(stages):
+    if np is not None:
+        return [(np.array([w.real for w in tw]), np.array([w.imag for w in tw])) for tw in stages]
+    return [(array("d", [w.real for w in tw]), array("d", [w.imag for w in tw])) for tw in stages]
+
+
+def _soa_stages(plan, key):
+    t = plan.soa_tables
+    if key not in t:
+        t[key] = _soa_split(plan.stages if key == "fwd" else plan.stages_inv)
+    return t[key]
+
+
+def _table_stages(W):
+    entry = _STAGE_CACHE.get(id(W))
+    if entry is None or entry[0] is not W:
+        entry = (W, stage_twiddles(W), {})
+        _STAGE_CACHE.put(id(W), entry)
+    return entry
+
+
+def _butterflies_soa(v, stages):
+    if np is not None:
+        re, im = _np_views(v)
+        n = re.shape[0]
+        for wr, wi in stages:
+            half = wr.shape[0]
+            R = re.reshape(n // (2 * half), 2, half)
+            I = im.reshape(n // (2 * half), 2, half)
+            xr, xi = R[:, 1, :], I[:, 1, :]
+            vr = xr * wr - xi * wi
+            vi = xr * wi + xi * wr
+            R[:, 1, :] = R[:, 0, :] - vr
+            I[:, 1, :] = I[:, 0, :] - vi
+            R[:, 0, :] += vr
+            I[:, 0, :] += vi
+        return
+    re, im = v.re, v.im
+    n = len(re)
+    half = 1
+    for wr, wi in stages:
+        length = 2 * half
         for start in range(0, n, length):
-            w = 1+0j
             for j in range(half):
-                u = A[start + j]
-                v = A[start + j + half] * w
-                A[start + j] = u + v
-                A[start + j + half] = u - v
-                w *= Winv[step]
-        length <<= 1
+                p = start + j
+                k = p + half
+                c, d = wr[j], wi[j]
+                xr, xi = re[k], im[k]
+                vr = xr * c - xi * d
+                vi = xr * d + xi * c
+                ur, ui = re[p], im[p]
+                re[p] = ur + vr
+                im[p] = ui + vi
+                re[k] = ur - vr
+                im[k] = ui - vi
+        half = length
+
+
+def _scale_soa(v, alpha):
+    if np is not None:
+        re, im = _np_views(v)
+        re *= alpha
+        im *= alpha
+        return
+    re, im = v.re, v.im
+    for i in range(len(re)):
+        re[i] *= alpha
+        im[i] *= alpha
+
+
+def _fft_soa(v, plan, key):
+    _bitrev_shuffle(v.re, plan.bitrev)
+    _bitrev_shuffle(v.im, plan.bitrev)
+    _butterflies_soa(v, _soa_stages(plan, key))
+
+
+def _fft_table(a, W, bitrev):
+    _, stages, soa = _table_stages(W)
+    if isinstance(a, ComplexVec):
+        if "soa" not in soa:
+            soa["soa"] = _soa_split(stages)
+        _bitrev_shuffle(a.re, bitrev)
+        _bitrev_shuffle(a.im, bitrev)
+        _butterflies_soa(a, soa["soa"])
+        return
+    _bitrev_shuffle(a, bitrev)
+    _butterflies(a, stages)
+
+
+def fft_inplace(a, W, bitrev):
+    n = len(a)
+    assert is_power_of_two(n), "fft_inplace: n must be power of two"
+    _fft_table(a, W, bitrev)
+
+
+def ifft_inplace(A, Winv, bitrev):
+    n = len(A)
+    assert is_power_of_two(n), "ifft_inplace: n must be power of two"
+    _fft_table(A, Winv, bitrev)
+    if isinstance(A, ComplexVec):
+        _scale_soa(A, 1.0 / n)
+        return
 
     inv_n = 1.0 / n
     for i in range(n):
         A[i] *= inv_n
 
 
+def fft_plan_inplace(a, plan):
+    if isinstance(a, ComplexVec):
+        _fft_soa(a, plan, "fwd")
+        return
+    _bitrev_shuffle(a, plan.bitrev)
+    _butterflies(a, plan.stages)
+
+
+def ifft_plan_inplace(A, plan):
+    if isinstance(A, ComplexVec):
+        _fft_soa(A, plan, "inv")
+        _scale_soa(A, 1.0 / plan.n)
+        return
+    _bitrev_shuffle(A, plan.bitrev)
+    _butterflies(A, plan.stages_inv)
+    inv_n = 1.0 / plan.n
+    for i in range(plan.n):
+        A[i] *= inv_n
+
+
 def fft(x):
     a = [complex(z) for z in x]
     n = len(a)
     assert is_power_of_two(n), "fft: length must be power of two"
-    W, _Winv = precompute_twiddles(n)
-    perm = bitrev_permutation(n)
-    fft_inplace(a, W, perm)
+    fft_plan_inplace(a, get_cfft_plan(n))
     return a
 
 
@@ -97,44 +301,174 @@ def ifft(X):
     A = [complex(z) for z in X]
     n = len(A)
     assert is_power_of_two(n), "ifft: length must be power of two"
-    _W, Winv = precompute_twiddles(n)
-    perm = bitrev_permutation(n)
-    ifft_inplace(A, Winv, perm)
+    ifft_plan_inplace(A, get_cfft_plan(n))
     return A
 
 
-def hadamard_product(A, B):
-    A = list(A)
-    B = list(B)
+def fft_negacyclic(f):
+    n = len(f)
+    assert n >= 2 and is_power_of_two(n), "fft_negacyclic: length must be a power of two >= 2"
+    h = n // 2
+    plan = get_cfft_plan(h)
+    tw = plan.neg_twist
+    u = [complex(f[j], f[j + h]) * tw[j] for j in range(h)]
+    _bitrev_shuffle(u, plan.bitrev)
+    _butterflies(u, plan.stages_inv)
+    return u
+
+
+def ifft_negacyclic(F):
+    h = len(F)
+    assert is_power_of_two(h), "ifft_negacyclic: length must be a power of two"
+    plan = get_cfft_plan(h)
+    u = list(F)
+    _bitrev_shuffle(u, plan.bitrev)
+    _butterflies(u, plan.stages)
+    inv_h = 1.0 / h
+    tw = plan.neg_twist
+    out = [0.0] * (2 * h)
+    for j in range(h):
+        z = u[j] * tw[j].conjugate() * inv_h
+        out[j] = z.real
+        out[j + h] = z.imag
+    return out
+
+
+def adj_fft(A):
+    return [a.conjugate() for a in A]
+
+
+def div_fft(A, B):
+    assert len(A) == len(B), "div_fft: size mismatch"
+    return [a / b for a, b in zip(A, B)]
+
+
+def split_fft(F):
+    h = len(F)
+    if h == 1:
+        return [complex(F[0].real)], [complex(F[0].imag)]
+    q = h // 2
+    roots = get_cfft_plan(h).split_roots
+    f0 = [0j] * q
+    f1 = [0j] * q
+    for m in range(q):
+        a, b = F[m], F[m + q]
+        f0[m] = 0.5 * (a + b)
+        f1[m] = 0.5 * (a - b) * roots[m].conjugate()
+    return f0, f1
+
+
+def merge_fft(f0, f1, deg=None):
+    q = len(f0)
+    assert len(f1) == q, "merge_fft: size mismatch"
+    if deg == 2:
+        return [complex(f0[0].real, f1[0].real)]
+    roots = get_cfft_plan(2 * q).split_roots
+    F = [0j] * (2 * q)
+    for m in range(q):
+        t = roots[m] * f1[m]
+        F[m] = f0[m] + t
+        F[m + q] = f0[m] - t
+    return F
+
+
+def _soa_out(A, out):
+    return ComplexVec.zeros(len(A)) if out is None else out
+
+
+def hadamard_product(A, B, out=None):
     assert len(A) == len(B), "hadamard_product: size mismatch"
-    return [A[i] * B[i] for i in range(len(A))]
+    if isinstance(A, ComplexVec):
+        out = _soa_out(A, out)
+        if np is not None:
+            ar, ai = _np_views(A)
+            br, bi = _np_views(B)
+            orr, oi = _np_views(out)
+            r = ar * br - ai * bi
+            oi[:] = ar * bi + ai * br
+            orr[:] = r
+            return out
+        ar, ai, br, bi = A.re, A.im, B.re, B.im
+        r = array("d", map(sub, map(mul, ar, br), map(mul, ai, bi)))
+        out.im[:] = array("d", map(add, map(mul, ar, bi), map(mul, ai, br)))
+        out.re[:] = r
+        return out
+    if out is None:
+        return [a * b for a, b in zip(A, B)]
+    for i, (a, b) in enumerate(zip(A, B)):
+        out[i] = a * b
+    return out
 
 
 def scale_complex(X, alpha):
     return [alpha * z for z in X]
 
 
-def add_complex(A, B):
-    A = list(A)
-    B = list(B)
+def _soa_linear(A, B, out, sign):
+    out = _soa_out(A, out)
+    if np is not None:
+        ar, ai = _np_views(A)
+        br, bi = _np_views(B)
+        orr, oi = _np_views(out)
+        if sign > 0:
+            np.add(ar, br, out=orr)
+            np.add(ai, bi, out=oi)
+        else:
+            np.subtract(ar, br, out=orr)
+            np.subtract(ai, bi, out=oi)
+        return out
+    op = add if sign > 0 else sub
+    out.re[:] = array("d", map(op, A.re, B.re))
+    out.im[:] = array("d", map(op, A.im, B.im))
+    return out
+
+
+def add_complex(A, B, out=None):
     assert len(A) == len(B), "add_complex: size mismatch"
-    return [A[i] + B[i] for i in range(len(A))]
+    if isinstance(A, ComplexVec):
+        return _soa_linear(A, B, out, 1)
+    if out is None:
+        return [a + b for a, b in zip(A, B)]
+    for i, (a, b) in enumerate(zip(A, B)):
+        out[i] = a + b
+    return out
 
 
-def sub_complex(A, B):
-    A = list(A)
-    B = list(B)
+def sub_complex(A, B, out=None):
     assert len(A) == len(B), "sub_complex: size mismatch"
-    return [A[i] - B[i] for i in range(len(A))]
+    if isinstance(A, ComplexVec):
+        return _soa_linear(A, B, out, -1)
+    if out is None:
+        return [a - b for a, b in zip(A, B)]
+    for i, (a, b) in enumerate(zip(A, B)):
+        out[i] = a - b
+    return out
+
+
+def hadamard_inplace(A, B):
+    return hadamard_product(A, B, out=A)
+
+
+def add_inplace(A, B):
+    return add_complex(A, B, out=A)
+
+
+def sub_inplace(A, B):
+    return sub_complex(A, B, out=A)
 
 
 def fft_real(x):
-    return fft([complex(float(t), 0.0) for t in x])
+    a = [complex(float(t), 0.0) for t in x]
+    assert is_power_of_two(len(a)), "fft_real: length must be power of two"
+    fft_plan_inplace(a, get_cfft_plan(len(a)))
+    return a
 
 
 def ifft_to_real(X):
-    y = ifft(X)
-    return [float(z.real) for z in y]
+    A = [complex(z) for z in X]
+    assert is_power_of_two(len(A)), "ifft_to_real: length must be power of two"
+    ifft_plan_inplace(A, get_cfft_plan(len(A)))
+    return [z.real for z in A]
 
 
 def max_abs_diff(A, B):
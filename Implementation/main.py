@@ -1,8 +1,8 @@
 import unittest
 import time
 from io import StringIO
-from tests import (test_modular_big, test_poly, test_ntt, test_cfft, test_rng_hash, test_pairgen, test_unifcrown,
-                   test_ntrusolve, test_sample_precomp, test_samplers, test_comp_decomp, test_algoritm_solmae)
+from tests import (test_cache, test_modular_big, test_poly, test_polyvec, test_ntt, test_cfft, test_rng_hash, test_pairgen, test_unifcrown,
+                   test_ntrusolve, test_rns, test_ntrugen, test_sample_precomp, test_samplers, test_sampling_key, test_comp_decomp, test_algoritm_solmae)
 
 
 def run_tests_with_timing(test):
@@ -25,12 +25,18 @@ def run_tests_with_timing(test):
 
 
 def main():
+    print(f'============================== TEST LRU CACHE ==========================')
+    run_tests_with_timing(test_cache)
+
     print(f'============================== TEST BIG MODULAR OPERATIONS ==========================')
     run_tests_with_timing(test_modular_big)
 
     print(f'============================== TEST POLYNOM OPERATIONS ==========================')
     run_tests_with_timing(test_poly)
 
+    print(f'============================== TEST POLYNOM VECTORS AND MATRICES ==========================')
+    run_tests_with_timing(test_polyvec)
+
     print(f'============================== TEST NTT ==========================')
     run_tests_with_timing(test_ntt)
 
@@ -49,12 +55,21 @@ def main():
     print(f'============================== TEST NTRUSOLVE ==========================')
     run_tests_with_timing(test_ntrusolve)
 
+    print(f'============================== TEST RNS ================================')
+    run_tests_with_timing(test_rns)
+
+    print(f'============================== TEST NTRU KEYGEN ========================')
+    run_tests_with_timing(test_ntrugen)
+
     print(f'============================== TEST SAMPLE PRECOMPUTATION ==========================')
     run_tests_with_timing(test_sample_precomp)
 
     print(f'============================== TEST SAMPLERS ==========================')
     run_tests_with_timing(test_samplers)
 
+    print(f'============================== TEST SAMPLING KEY =======================')
+    run_tests_with_timing(test_sampling_key)
+
     print(f'============================== TEST COMPRESS AND DECOMPRESS ==========================')
     run_tests_with_timing(test_comp_decomp)
 
@@ -1,3 +1,15 @@
+from dataclasses import dataclass
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+SHOUP_BITS = 31
+
+
 def add_mod(num1, num2, mod):
     return ((num1 % mod) + (num2 % mod)) % mod
 
@@ -22,4 +34,140 @@ def inv_mod(num1, mod):
         r, new_r = new_r, r - qout * new_r
     if r != 1:
         raise ValueError("inv_mod: a is not inverse")
-    return t % mod
\ No newline at end of file
+    return t % mod
+
+
+class NonInvertibleError(ValueError):
+    def __init__(self, indices, mod):
+        self.indices = list(indices)
+        super().__init__(f"inv_mod_batch: elements at indices {self.indices} are not invertible mod {mod}")
+
+
+def inv_mod_batch(values, mod):
+    vals = [v % mod for v in values]
+    count = len(vals)
+    if count == 0:
+        return []
+    prefix = [0] * count
+    acc = 1
+    for i, v in enumerate(vals):
+        acc = acc * v % mod
+        prefix[i] = acc
+    try:
+        inv = inv_mod(acc, mod)
+    except ValueError:
+        raise NonInvertibleError([i for i, v in enumerate(vals) if math.gcd(v, mod) != 1], mod) from None
+    out = [0] * count
+    for i in range(count - 1, 0, -1):
+        out[i] = inv * prefix[i - 1] % mod
+        inv = inv * vals[i] % mod
+    out[0] = inv
+    return out
+
+
+def add_mod_lazy(num1, num2, mod):
+    s = num1 + num2
+    return s - mod if s >= mod else s
+
+
+def sub_mod_lazy(num1, num2, mod):
+    s = num1 - num2
+    return s + mod if s < 0 else s
+
+
+def mul_mod_lazy(num1, num2, mod):
+    return num1 * num2 % mod
+
+
+@dataclass(frozen=True)
+class BarrettConst:
+    mod: int
+    m: int
+    k: int
+
+
+@dataclass(frozen=True)
+class MontgomeryConst:
+    mod: int
+    r_bits: int
+    qinv_neg: int
+    r2: int
+
+
+def barrett_const(mod, k=None):
+    if k is None:
+        k = 2 * mod.bit_length()
+    return BarrettConst(mod, (1 << k) // mod, k)
+
+
+def barrett_reduce(x, c):
+    t = x - ((x * c.m) >> c.k) * c.mod
+    return t - c.mod if t >= c.mod else t
+
+
+def montgomery_const(mod, r_bits=None):
+    if mod % 2 == 0:
+        raise ValueError("montgomery_const: modulus must be odd")
+    if r_bits is None:
+        r_bits = mod.bit_length() + 2
+    R = 1 << r_bits
+    qinv_neg = (-inv_mod(mod, R)) % R
+    return MontgomeryConst(mod, r_bits, qinv_neg, (R * R) % mod)
+
+
+def montgomery_reduce(x, c):
+    mask = (1 << c.r_bits) - 1
+    m = ((x & mask) * c.qinv_neg) & mask
+    t = (x + m * c.mod) >> c.r_bits
+    return t - c.mod if t >= c.mod else t
+
+
+def to_montgomery(num, c):
+    return montgomery_reduce((num % c.mod) * c.r2, c)
+
+
+def from_montgomery(num, c):
+    return montgomery_reduce(num, c)
+
+
+def montgomery_mul(num1, num2, c):
+    return montgomery_reduce(num1 * num2, c)
+
+
+def shoup_precompute(w, mod, bits=SHOUP_BITS):
+    return ((w % mod) << bits) // mod
+
+
+def mul_shoup(num, w, w_shoup, mod, bits=SHOUP_BITS):
+    r = num * w - ((num * w_shoup) >> bits) * mod
+    return r - mod if r >= mod else r
+
+
+def barrett_reduce_np(x, c):
+    assert 2 * c.k - c.mod.bit_length() < 63, "barrett_reduce_np: constants overflow int64"
+    t = x - ((x * c.m) >> c.k) * c.mod
+    np.subtract(t, c.mod, out=t, where=t >= c.mod)
+    return t
+
+
+def montgomery_reduce_np(x, c):
+    mask = (1 << c.r_bits) - 1
+    m = ((x & mask) * c.qinv_neg) & mask
+    t = (x + m * c.mod) >> c.r_bits
+    np.subtract(t, c.mod, out=t, where=t >= c.mod)
+    return t
+
+
+def mul_shoup_np(num, w, w_shoup, mod, bits=SHOUP_BITS):
+    assert bits <= 31, "mul_shoup_np: bits must be <= 31 to stay within int64"
+    r = num * w
+    t = num * w_shoup
+    t >>= bits
+    t *= mod
+    r -= t
+    np.subtract(r, mod, out=r, where=r >= mod)
+    return r
+
+
+Q12289_BARRETT = barrett_const(12289)
+Q12289_MONTGOMERY = montgomery_const(12289, 16)
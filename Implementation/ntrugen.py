@@ -0,0 +1,149 @@
+import math
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import List
+
+import cfft
+import ntrusolve as ns
+import ntt
+from params import n, q
+from rng import uniform_small
+
+
+QUALITY_BOUND = 1.3
+MAX_ATTEMPTS = 1000
+
+
+def default_radius(mod, deg):
+    return max(1, round(math.sqrt(3 * math.sqrt(2) * mod / (2 * deg))))
+
+
+def gram_schmidt_norm(f, g, mod):
+    deg = len(f)
+    sq_fg = sum(x * x for x in f) + sum(x * x for x in g)
+    F_fft = cfft.fft_negacyclic(f)
+    G_fft = cfft.fft_negacyclic(g)
+    inv_sum = 2 * sum(1.0 / (abs(a) ** 2 + abs(b) ** 2) for a, b in zip(F_fft, G_fft))
+    return math.sqrt(max(sq_fg, mod * mod * inv_sum / deg))
+
+
+def _invertible_mod_q(f, plan):
+    return all(ntt.negacyclic_ntt(f, plan))
+
+
+def attempt_keygen(mod, deg, radius, bound=QUALITY_BOUND):
+    f = uniform_small(deg, radius)
+    g = uniform_small(deg, radius)
+    if gram_schmidt_norm(f, g, mod) > bound * math.sqrt(mod):
+        return None, "quality"
+    if not _invertible_mod_q(f, ntt.get_ntt_plan(mod, deg)):
+        return None, "not_invertible"
+    try:
+        x, y = ns.ntru_solve_pp(f, g, mod)
+    except ValueError:
+        return None, "ntru_solve"
+    return (f, g, [-c for c in x], [-c for c in y]), None
+
+
+@dataclass
+class KeygenStats:
+    attempts: List[int] = field(default_factory=list)
+    latencies: List[float] = field(default_factory=list)
+    rejections: Counter = field(default_factory=Counter)
+
+    def record(self, attempts, latency):
+        self.attempts.append(attempts)
+        self.latencies.append(latency)
+
+    @staticmethod
+    def percentile(values, pct):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        rank = max(1, math.ceil(pct / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self):
+        keys = len(self.attempts)
+        return {
+            "keys": keys,
+            "attempts_mean": sum(self.attempts) / keys if keys else 0.0,
+            "attempts_max": max(self.attempts, default=0),
+            "attempts_hist": dict(sorted(Counter(self.attempts).items())),
+            "rejections": dict(self.rejections),
+            "latency_p50": self.percentile(self.latencies, 50),
+            "latency_p99": self.percentile(self.latencies, 99),
+            "latency_max": max(self.latencies, default=0.0),
+        }
+
+
+def _check_ring(mod, deg):
+    if not ntt.ntt_friendly(mod, deg):
+        raise ValueError(f"ntru keygen needs an NTT-friendly ring, got q={mod}, n={deg}")
+
+
+def _keygen_serial(count, mod, deg, radius, bound, max_attempts, stats):
+    keys = []
+    while len(keys) < count:
+        start = time.perf_counter()
+        for attempts in range(1, max_attempts + 1):
+            key, reason = attempt_keygen(mod, deg, radius, bound)
+            if key is not None:
+                break
+            stats.rejections[reason] += 1
+        else:
+            raise RuntimeError(f"ntru keygen: no key after {max_attempts} attempts")
+        stats.record(attempts, time.perf_counter() - start)
+        keys.append(key)
+    return keys
+
+
+def _keygen_speculative(count, mod, deg, radius, bound, max_attempts, stats, workers):
+    keys = []
+    ex = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = set()
+        attempts = 0
+        start = time.perf_counter()
+        while len(keys) < count:
+            while len(pending) < workers:
+                pending.add(ex.submit(attempt_keygen, mod, deg, radius, bound))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key, reason = fut.result()
+                attempts += 1
+                if key is None:
+                    stats.rejections[reason] += 1
+                    continue
+                if len(keys) < count:
+                    now = time.perf_counter()
+                    stats.record(attempts, now - start)
+                    keys.append(key)
+                    attempts, start = 0, now
+            if attempts >= max_attempts:
+                raise RuntimeError(f"ntru keygen: no key after {max_attempts} attempts")
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
+    return keys
+
+
+def ntru_keygen_many(count, mod=q, deg=n, radius=None, workers=None,
+                     bound=QUALITY_BOUND, max_attempts=MAX_ATTEMPTS, stats=None):
+    _check_ring(mod, deg)
+    if radius is None:
+        radius = default_radius(mod, deg)
+    if stats is None:
+        stats = KeygenStats()
+    if workers is None or workers <= 1:
+        keys = _keygen_serial(count, mod, deg, radius, bound, max_attempts, stats)
+    else:
+        keys = _keygen_speculative(count, mod, deg, radius, bound, max_attempts, stats, workers)
+    return keys, stats
+
+
+def ntru_keygen(mod=q, deg=n, radius=None, workers=None,
+                bound=QUALITY_BOUND, max_attempts=MAX_ATTEMPTS, stats=None):
+    keys, _ = ntru_keygen_many(1, mod, deg, radius, workers, bound, max_attempts, stats)
+    return keys[0]
@@ -1,8 +1,53 @@
 from __future__ import annotations
 import math
+import time
+
+import cfft
+
+
+_KRONECKER_MIN_N = 32
+_KRONECKER_MIN_N_WIDE = 16
+_KRONECKER_WIDE_BITS = 64
+
+
+def _kronecker_pack(num, nbytes):
+    pos = b"".join((x if x > 0 else 0).to_bytes(nbytes, "little") for x in num)
+    neg = b"".join((-x if x < 0 else 0).to_bytes(nbytes, "little") for x in num)
+    return int.from_bytes(pos, "little") - int.from_bytes(neg, "little")
+
+
+def _kronecker_unpack(value, nbytes, count):
+    bias_digit = (1 << (8 * nbytes - 1)).to_bytes(nbytes, "little")
+    bias = int.from_bytes(bias_digit * count, "little")
+    raw = (value + bias).to_bytes(nbytes * count, "little")
+    half = 1 << (8 * nbytes - 1)
+    return [int.from_bytes(raw[i:i + nbytes], "little") - half for i in range(0, nbytes * count, nbytes)]
+
+
+def _max_bits(num):
+    return max((abs(x).bit_length() for x in num), default=0)
+
+
+def z_negacyclic_mul_kronecker(num1, num2):
+    n = len(num1)
+    assert len(num2) == n
+    bits = _max_bits(num1) + _max_bits(num2) + n.bit_length() + 1
+    nbytes = (bits + 7) // 8
+    prod = _kronecker_pack(num1, nbytes) * _kronecker_pack(num2, nbytes)
+    c = _kronecker_unpack(prod, nbytes, 2 * n)
+    return [c[i] - c[i + n] for i in range(n)]
 
 
 def z_negacyclic_mul(num1, num2):
+    n = len(num1)
+    assert len(num2) == n
+    if n >= _KRONECKER_MIN_N or (n >= _KRONECKER_MIN_N_WIDE
+                                 and max(_max_bits(num1), _max_bits(num2)) >= _KRONECKER_WIDE_BITS):
+        return z_negacyclic_mul_kronecker(num1, num2)
+    return z_negacyclic_mul_schoolbook(num1, num2)
+
+
+def z_negacyclic_mul_schoolbook(num1, num2):
     n = len(num1)
     assert len(num2) == n
     acc = [0] * n
@@ -101,26 +146,20 @@ def closest_rounding_div_q(num, mod):
 
 def reduce_target(F, G, f, g, mod):
     assert len(F) == len(G) == len(f) == len(g)
-    num = 0
-    den = 0
-    for i in range(len(F)):
-        num += f[i] * F[i] + g[i] * G[i]
-        den += F[i] * F[i] + G[i] * G[i]
-    if den == 0:
-        return f, g
-    k = int(round(num / den))
-    if k != 0:
-        f = [f[i] - k * F[i] for i in range(len(F))]
-        g = [g[i] - k * G[i] for i in range(len(G))]
+    f, g = babai_reduce(F, G, f, g)
     return z_centered_mod_q(f, mod), z_centered_mod_q(g, mod)
 
 
 def _xgcd(num1, num2):
-    if num2 == 0:
-        return (abs(num1), 1 if num1 > 0 else -1, 0)
-    g, x1, y1 = _xgcd(num2, num1 % num2)
-
-    return (g, y1, x1 - (num1 // num2) * y1)
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while num2 != 0:
+        qt, r = divmod(num1, num2)
+        num1, num2 = num2, r
+        x0, x1 = x1, x0 - qt * x1
+        y0, y1 = y1, y0 - qt * y1
+    if num1 < 0:
+        return (-num1, -x0, -y0)
+    return (num1, x0, y0)
 
 
 def basecase_solve(F, G, mod):
@@ -137,23 +176,104 @@ def basecase_solve(F, G, mod):
     return [f], [g_coef]
 
 
-def ntru_solve_pp(F, G, mod):
-    n = len(F)
-    assert n == len(G), "F and G must have same length"
+def galois_conjugate(num):
+    return [-x if i & 1 else x for i, x in enumerate(num)]
+
+
+def field_norm(num):
+    ae, ao = split_even_odd(num)
+    ae2 = z_negacyclic_mul(ae, ae)
+    ao2 = z_negacyclic_mul(ao, ao)
+    return [ae2[0] + ao2[-1]] + [ae2[i] - ao2[i - 1] for i in range(1, len(ae2))]
+
+
+def lift(num):
+    out = [0] * (2 * len(num))
+    out[0::2] = num
+    return out
+
+
+_FFT_FLOAT_BITS = 53
+_BABAI_EXTRA_BITS = 24
+
+
+def _neg_fft(num):
+    if len(num) == 1:
+        return [complex(num[0])]
+    return cfft.fft_negacyclic(num)
+
+
+def _neg_ifft(values, n):
     if n == 1:
-        return basecase_solve(F, G, mod)
+        return [values[0].real]
+    return cfft.ifft_negacyclic(values)
+
 
-    Fe, Fo = split_even_odd(F)
-    Ge, Go = split_even_odd(G)
+def _sq_norm(num):
+    return sum(x * x for x in num)
 
-    fe, ge = ntru_solve_pp(Fe, Ge, mod)
 
-    f_lift = lift_up(fe, [0]*len(fe))
-    g_lift = lift_up(ge, [0]*len(ge))
+def _top_bits_fft(num, size):
+    shift = max(0, size - _FFT_FLOAT_BITS)
+    return _neg_fft([float(x >> shift) for x in num])
 
-    f_red, g_red = reduce_target(F, G, f_lift, g_lift, mod)
 
-    raise NotImplementedError("PP-recursion merge step is not implemented yet (skeleton returned).")
+def babai_reduce(F, G, f, g):
+    n = len(F)
+    assert n == len(G) == len(f) == len(g)
+    size = max(_FFT_FLOAT_BITS, _max_bits(F), _max_bits(G))
+    F_fft = _top_bits_fft(F, size)
+    G_fft = _top_bits_fft(G, size)
+    den_fft = [a * a.conjugate() + b * b.conjugate() for a, b in zip(F_fft, G_fft)]
+    while True:
+        Size = max(_FFT_FLOAT_BITS, _max_bits(f), _max_bits(g))
+        if Size < size:
+            break
+        f_fft = _top_bits_fft(f, Size)
+        g_fft = _top_bits_fft(g, Size)
+        k_fft = [(fa * Fa.conjugate() + ga * Ga.conjugate()) / d if d else 0j
+                 for fa, ga, Fa, Ga, d in zip(f_fft, g_fft, F_fft, G_fft, den_fft)]
+        shift = max(0, Size - size - _BABAI_EXTRA_BITS)
+        k = [int(round(math.ldexp(x, Size - size - shift))) for x in _neg_ifft(k_fft, n)]
+        if not any(k):
+            break
+        kF = z_negacyclic_mul(k, F)
+        kG = z_negacyclic_mul(k, G)
+        f_new = [f[i] - (kF[i] << shift) for i in range(n)]
+        g_new = [g[i] - (kG[i] << shift) for i in range(n)]
+        if shift == 0:
+            if _sq_norm(f_new) + _sq_norm(g_new) >= _sq_norm(f) + _sq_norm(g):
+                break
+        elif max(_max_bits(f_new), _max_bits(g_new)) >= Size:
+            break
+        f, g = f_new, g_new
+    return f, g
+
+
+def ntru_solve_pp(F, G, mod, timings=None):
+    n = len(F)
+    assert n == len(G), "F and G must have same length"
+    if n == 1:
+        start = time.perf_counter()
+        out = basecase_solve(F, G, mod)
+        if timings is not None:
+            timings.append((1, time.perf_counter() - start))
+        return out
+
+    start = time.perf_counter()
+    F_norm, G_norm = field_norm(F), field_norm(G)
+    elapsed = time.perf_counter() - start
+
+    f_half, g_half = ntru_solve_pp(F_norm, G_norm, mod, timings)
+
+    start = time.perf_counter()
+    f = z_negacyclic_mul(lift(f_half), galois_conjugate(G))
+    g = z_negacyclic_mul(lift(g_half), galois_conjugate(F))
+    f, g = babai_reduce(F, G, f, g)
+    elapsed += time.perf_counter() - start
+    if timings is not None:
+        timings.append((n, elapsed))
+    return f, g
 
 
 def poly_to_z(p_coeffs, n):
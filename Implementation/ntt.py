@@ -1,11 +1,42 @@
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from cache import LRUCache
+from modular import inv_mod
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@dataclass
+class NTTPlan:
+    q: int
+    n: int
+    psi: int
+    roots: List[int]
+    roots_inv: List[int]
+    bitrev: List[int]
+    tw_fwd: List[int]
+    tw_inv: List[int]
+    zetas: List[int] = field(default_factory=list)
+    zetas_inv: List[int] = field(default_factory=list)
+    inv_n: int = 1
+    np_tables: Dict[str, object] = field(default_factory=dict, repr=False, compare=False)
+
+
+_PLAN_CACHE = LRUCache(capacity=8)
 
-from modular import add_mod, sub_mod, mul_mod, inv_mod
 
 def is_power_of_two(n):
     return n > 0 and (n & (n - 1)) == 0
 
 
+def ntt_friendly(mod, deg):
+    return is_power_of_two(deg) and (mod - 1) % (2 * deg) == 0
+
+
 def factorize(n):
     fs: List[int] = []
     d = 2
@@ -74,12 +105,12 @@ def precompute_roots(mod, n, psi):
         w = 1
         for _ in range(half):
             roots.append(w)
-            w = mul_mod(w, w_len, mod)
+            w = w * w_len % mod
         w_len_inv = inv_mod(w_len, mod)
         w = 1
         for _ in range(half):
             roots_inv.append(w)
-            w = mul_mod(w, w_len_inv, mod)
+            w = w * w_len_inv % mod
         length <<= 1
 
     return roots, roots_inv, bitrev_permutation(n)
@@ -90,11 +121,19 @@ def precompute_twists(mod, n, psi):
     tw_inv = [1] * n
     inv_psi = inv_mod(psi, mod)
     for i in range(1, n):
-        tw_fwd[i] = mul_mod(tw_fwd[i - 1], psi, mod)
-        tw_inv[i] = mul_mod(tw_inv[i - 1], inv_psi, mod)
+        tw_fwd[i] = tw_fwd[i - 1] * psi % mod
+        tw_inv[i] = tw_inv[i - 1] * inv_psi % mod
     return tw_fwd, tw_inv
 
 
+def precompute_zetas(mod, n, psi):
+    br = bitrev_permutation(n)
+    inv_psi = inv_mod(psi, mod)
+    zetas = [pow(psi, br[i], mod) for i in range(n)]
+    zetas_inv = [pow(inv_psi, br[i], mod) for i in range(n)]
+    return zetas, zetas_inv
+
+
 def _bitrev_shuffle(a, perm):
     n = len(a)
     for i in range(n):
@@ -114,9 +153,9 @@ def ntt_inplace(a, mod, roots, bitrev):
         for i in range(0, n, length):
             for j in range(half):
                 u = a[i + j]
-                v = mul_mod(a[i + j + half], layer[j], mod)
-                a[i + j] = add_mod(u, v, mod)
-                a[i + j + half] = sub_mod(u, v, mod)
+                v = a[i + j + half] * layer[j] % mod
+                a[i + j] = (u + v) % mod
+                a[i + j + half] = (u - v) % mod
         stage += half
         length <<= 1
 
@@ -132,38 +171,225 @@ def intt_inplace(a, mod, roots_inv, bitrev):
         for i in range(0, n, length):
             for j in range(half):
                 u = a[i + j]
-                v = mul_mod(a[i + j + half], layer[j], mod)
-                a[i + j] = add_mod(u, v, mod)
-                a[i + j + half] = sub_mod(u, v, mod)
+                v = a[i + j + half] * layer[j] % mod
+                a[i + j] = (u + v) % mod
+                a[i + j + half] = (u - v) % mod
         stage += half
         length <<= 1
     inv_n = inv_mod(n % mod, mod)
     for i in range(n):
-        a[i] = mul_mod(a[i], inv_n, mod)
+        a[i] = a[i] * inv_n % mod
 
 
 def negacyclic_convolution(num1, num2, mod, roots, roots_inv, bitrev, tw_fwd, tw_inv):
     n = len(num1)
-    A = [mul_mod(ai % mod, tw_fwd[i], mod) for i, ai in enumerate(num1)]
-    B = [mul_mod(bi % mod, tw_fwd[i], mod) for i, bi in enumerate(num2)]
+    A = [ai % mod * tw_fwd[i] % mod for i, ai in enumerate(num1)]
+    B = [bi % mod * tw_fwd[i] % mod for i, bi in enumerate(num2)]
     ntt_inplace(A, mod, roots, bitrev)
     ntt_inplace(B, mod, roots, bitrev)
-    C = [mul_mod(A[i], B[i], mod) for i in range(n)]
+    C = [A[i] * B[i] % mod for i in range(n)]
     intt_inplace(C, mod, roots_inv, bitrev)
-    C = [mul_mod(C[i], tw_inv[i], mod) for i in range(n)]
+    C = [C[i] * tw_inv[i] % mod for i in range(n)]
     return C
 
 
-def poly_mul_rq_ntt(num1, num2, mod, deg):
-    assert len(num1) == deg and len(num2) == deg, "polys must have length d"
+def build_ntt_plan(mod, deg):
     assert is_power_of_two(deg), "d must be a power of two"
     assert (mod - 1) % (2 * deg) == 0, "2d must divide (q-1)"
-
     psi = primitive_root_for(mod, 2 * deg)
     roots, roots_inv, bitrev = precompute_roots(mod, deg, psi)
     tw_fwd, tw_inv = precompute_twists(mod, deg, psi)
+    zetas, zetas_inv = precompute_zetas(mod, deg, psi)
+    inv_n = inv_mod(deg % mod, mod)
+    return NTTPlan(mod, deg, psi, roots, roots_inv, bitrev, tw_fwd, tw_inv, zetas, zetas_inv, inv_n)
+
+
+def get_ntt_plan(mod, deg):
+    mod, deg = int(mod), int(deg)
+    return _PLAN_CACHE.get_or_build((mod, deg), lambda: build_ntt_plan(mod, deg))
+
+
+def ntt_plan_cache_info():
+    return _PLAN_CACHE.info()
+
+
+def ntt_plan_cache_clear():
+    _PLAN_CACHE.clear()
+
+
+def set_ntt_plan_cache_capacity(capacity):
+    _PLAN_CACHE.resize(capacity)
+
+
+def negacyclic_ntt(a, plan):
+    mod = plan.q
+    A = [x % mod for x in a]
+    ntt_ct_inplace(A, mod, plan.zetas)
+    return A
+
+
+def negacyclic_intt(A, plan):
+    C = list(A)
+    intt_gs_inplace(C, plan.q, plan.zetas_inv, plan.inv_n)
+    return C
+
+
+def negacyclic_convolution_plan(num1, num2, plan):
+    mod = plan.q
+    A = negacyclic_ntt(num1, plan)
+    B = negacyclic_ntt(num2, plan)
+    C = [x * y % mod for x, y in zip(A, B)]
+    intt_gs_inplace(C, mod, plan.zetas_inv, plan.inv_n)
+    return C
+
+
+def poly_mul_rq_ntt(num1, num2, mod, deg):
+    assert len(num1) == deg and len(num2) == deg, "polys must have length d"
+    plan = get_ntt_plan(mod, deg)
+    return negacyclic_convolution(num1, num2, mod, plan.roots, plan.roots_inv,
+                                  plan.bitrev, plan.tw_fwd, plan.tw_inv)
+
+
+def ntt_ct_inplace(a, mod, zetas):
+    n = len(a)
+    k = 1
+    length = n >> 1
+    while length >= 1:
+        for start in range(0, n, 2 * length):
+            zeta = zetas[k]
+            k += 1
+            for j in range(start, start + length):
+                u = a[j]
+                t = zeta * a[j + length] % mod
+                a[j] = (u + t) % mod
+                a[j + length] = (u - t) % mod
+        length >>= 1
+
+
+def intt_gs_inplace(a, mod, zetas_inv, inv_n):
+    n = len(a)
+    if n == 1:
+        a[0] = a[0] * inv_n % mod
+        return
+    length = 1
+    while length < n >> 1:
+        k = n // (2 * length)
+        for start in range(0, n, 2 * length):
+            zeta = zetas_inv[k]
+            k += 1
+            for j in range(start, start + length):
+                u = a[j]
+                v = a[j + length]
+                a[j] = (u + v) % mod
+                a[j + length] = (u - v) * zeta % mod
+        length <<= 1
+    half = n >> 1
+    zeta_n = zetas_inv[1] * inv_n % mod
+    for j in range(half):
+        u = a[j]
+        v = a[j + half]
+        a[j] = (u + v) * inv_n % mod
+        a[j + half] = (u - v) * zeta_n % mod
+
+
+def _np_tables(plan):
+    t = plan.np_tables
+    if t:
+        return t
+    if np is None:
+        raise RuntimeError("numpy NTT requested but numpy is not installed")
+    mod, n = plan.q, plan.n
+    assert mod < (1 << 31), "numpy NTT needs q < 2^31 to stay within int64"
+    fwd, inv = [], []
+    stage = 0
+    length = 2
+    while length <= n:
+        half = length // 2
+        fwd.append(np.array(plan.roots[stage: stage + half], dtype=np.int64))
+        inv.append(np.array(plan.roots_inv[stage: stage + half], dtype=np.int64))
+        stage += half
+        length <<= 1
+    t["bitrev"] = np.array(plan.bitrev, dtype=np.intp)
+    t["fwd"] = fwd
+    t["inv"] = inv
+    t["inv_n"] = plan.inv_n
+    t["tw_fwd"] = np.array(plan.tw_fwd, dtype=np.int64)
+    t["tw_inv_n"] = np.array([x * plan.inv_n % mod for x in plan.tw_inv], dtype=np.int64)
+    t["lazy"] = (len(fwd) + 2) * mod * mod < (1 << 63)
+    return t
+
+
+def _np_layers(a, mod, layers, lazy):
+    shape = a.shape
+    n = shape[-1]
+    lead = shape[:-1]
+    for w in layers:
+        half = w.shape[0]
+        b = a.reshape(lead + (n // (2 * half), 2, half))
+        v = b[..., 1, :] * w
+        v %= mod
+        t = b[..., 0, :] - v
+        t += mod
+        b[..., 0, :] += v
+        b[..., 1, :] = t
+        if not lazy:
+            a %= mod
+    a %= mod
+    return a
+
+
+def ntt_np(a, plan):
+    t = _np_tables(plan)
+    A = np.asarray(a, dtype=np.int64) % plan.q
+    return _np_layers(A[..., t["bitrev"]], plan.q, t["fwd"], t["lazy"])
+
+
+def intt_np(A, plan):
+    t = _np_tables(plan)
+    a = np.asarray(A, dtype=np.int64) % plan.q
+    a = _np_layers(a[..., t["bitrev"]], plan.q, t["inv"], t["lazy"])
+    return a * t["inv_n"] % plan.q
+
+
+def negacyclic_convolution_np(num1, num2, plan):
+    t = _np_tables(plan)
+    mod = plan.q
+    perm, lazy = t["bitrev"], t["lazy"]
+    A = np.asarray(num1, dtype=np.int64) % mod * t["tw_fwd"] % mod
+    B = np.asarray(num2, dtype=np.int64) % mod * t["tw_fwd"] % mod
+    A = _np_layers(A[..., perm], mod, t["fwd"], lazy)
+    B = _np_layers(B[..., perm], mod, t["fwd"], lazy)
+    C = _np_layers((A * B % mod)[..., perm], mod, t["inv"], lazy)
+    return C * t["tw_inv_n"] % mod
+
+
+def ntt_batch(M, plan, negacyclic=True):
+    t = _np_tables(plan)
+    mod = plan.q
+    A = np.asarray(M, dtype=np.int64) % mod
+    if negacyclic:
+        A = A * t["tw_fwd"] % mod
+    return _np_layers(A[..., t["bitrev"]], mod, t["fwd"], t["lazy"])
+
+
+def intt_batch(M, plan, negacyclic=True):
+    t = _np_tables(plan)
+    mod = plan.q
+    A = np.asarray(M, dtype=np.int64) % mod
+    A = _np_layers(A[..., t["bitrev"]], mod, t["inv"], t["lazy"])
+    if negacyclic:
+        return A * t["tw_inv_n"] % mod
+    return A * t["inv_n"] % mod
+
 
-    return negacyclic_convolution(num1, num2, mod, roots, roots_inv, bitrev, tw_fwd, tw_inv)
+def pointwise_mac_batch(A_hat, s_hat, mod):
+    A_hat = np.asarray(A_hat, dtype=np.int64)
+    s_hat = np.asarray(s_hat, dtype=np.int64)
+    assert A_hat.shape[-2:] == s_hat.shape[-2:], "pointwise_mac_batch: shape mismatch"
+    prod = A_hat * s_hat
+    if A_hat.shape[-2] * (mod - 1) * (mod - 1) >= (1 << 63):
+        prod %= mod
+    return prod.sum(axis=-2) % mod
 
 
 def ntt(a, mod, roots, bitrev):
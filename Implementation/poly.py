@@ -1,23 +1,59 @@
 from typing import Iterable, List
 import random
 
-from modular import add_mod, sub_mod, mul_mod
+import ntt
+from modular import inv_mod_batch
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_NP_MAX_MOD = 1 << 31
+
+
+def _same_ring(plan1, plan2):
+    return plan1 is plan2 or (plan1.q, plan1.n) == (plan2.q, plan2.n)
 
 
 class Poly:
     _mod = None
     _deg = None
+    _ntt = None
+    _backend = "list"
+    _use_np = False
 
     @classmethod
     def ring(cls, mod, deg):
         assert mod > 1 and deg >= 1
-        Poly._mod = int(mod)
-        Poly._deg = int(deg)
+        mod, deg = int(mod), int(deg)
+        if Poly._mod != mod or Poly._deg != deg:
+            Poly._ntt = ntt.get_ntt_plan(mod, deg) if ntt.ntt_friendly(mod, deg) else None
+        Poly._mod = mod
+        Poly._deg = deg
+        Poly._use_np = Poly._backend == "numpy" and mod < _NP_MAX_MOD
+
+    @classmethod
+    def set_backend(cls, name):
+        if name not in ("list", "numpy"):
+            raise ValueError(f"Unknown Poly backend: {name!r}")
+        if name == "numpy" and np is None:
+            raise RuntimeError("numpy backend requested but numpy is not installed")
+        Poly._backend = name
+        Poly._use_np = name == "numpy" and Poly._mod is not None and Poly._mod < _NP_MAX_MOD
+
+    @classmethod
+    def backend(cls):
+        return "numpy" if Poly._use_np else "list"
 
     def __init__(self, coeffs: Iterable[int]):
         if Poly._mod is None or Poly._deg is None:
             raise RuntimeError("First, call Poly.ring(q, d)")
         mod, deg = Poly._mod, Poly._deg
+        if Poly._use_np and isinstance(coeffs, np.ndarray) and coeffs.shape == (deg,):
+            self._c = np.remainder(coeffs.astype(np.int64, copy=False), mod)
+            return
         c = list(int(x) for x in coeffs)
         if len(c) > deg:
             base = c[:deg]
@@ -27,23 +63,50 @@ class Poly:
             c = base
         if len(c) < deg:
             c += [0] * (deg - len(c))
-        self.a = [ci % mod for ci in c]
+        c = [ci % mod for ci in c]
+        self._c = np.array(c, dtype=np.int64) if Poly._use_np else c
+
+    @staticmethod
+    def _from_reduced(coeffs):
+        obj = Poly.__new__(Poly)
+        if Poly._use_np:
+            obj._c = np.asarray(coeffs, dtype=np.int64)
+        else:
+            obj._c = coeffs if type(coeffs) is list else coeffs.tolist()
+        return obj
+
+    @property
+    def a(self):
+        c = self._c
+        return c if type(c) is list else c.tolist()
+
+    @a.setter
+    def a(self, coeffs):
+        self._c = coeffs
+
+    def _as_array(self):
+        c = self._c
+        return c if type(c) is not list else np.array(c, dtype=np.int64)
 
     def __add__(self, other):
         if not isinstance(other, Poly):
             return NotImplemented
         if Poly._mod != other._mod or Poly._deg != other._deg:
             raise ValueError("Various ring parameters for operands")
-        mod, deg = Poly._mod, Poly._deg
-        return Poly([(self.a[i] + other.a[i]) % mod for i in range(deg)])
+        mod = Poly._mod
+        if Poly._use_np:
+            return Poly._from_reduced(np.remainder(self._as_array() + other._as_array(), mod))
+        return Poly._from_reduced([(x + y) % mod for x, y in zip(self.a, other.a)])
 
     def __sub__(self, other):
         if not isinstance(other, Poly):
             return NotImplemented
         if Poly._mod != other._mod or Poly._deg != other._deg:
             raise ValueError("Various ring parameters for operands")
-        mod, deg = Poly._mod, Poly._deg
-        return Poly([(self.a[i] - other.a[i]) % mod for i in range(deg)])
+        mod = Poly._mod
+        if Poly._use_np:
+            return Poly._from_reduced(np.remainder(self._as_array() - other._as_array(), mod))
+        return Poly._from_reduced([(x - y) % mod for x, y in zip(self.a, other.a)])
 
     @staticmethod
     def _reduce_to_length_and_mod(c, mod, deg):
@@ -104,20 +167,21 @@ class Poly:
             return NotImplemented
         if Poly._mod != other._mod or Poly._deg != other._deg:
             raise ValueError("Various ring parameters for operands")
-        mod, deg = Poly._mod, Poly._deg
-        res = [0] * deg
-        for i in range(deg):
-            res[i] = op(self.a[i], other.a[i], mod)
-        return Poly(res)
+        mod = Poly._mod
+        return Poly([op(x, y, mod) for x, y in zip(self.a, other.a)])
 
     def __neg__(self):
         mod = Poly._mod
-        return Poly([(-x) % mod for x in self.a])
+        if Poly._use_np:
+            return Poly._from_reduced(np.remainder(-self._as_array(), mod))
+        return Poly._from_reduced([(-x) % mod for x in self.a])
 
     def _scalar_mul(self, c):
         mod = Poly._mod
         c %= mod
-        return Poly([(ai % mod) * c % mod for ai in self.a])
+        if Poly._use_np:
+            return Poly._from_reduced(np.remainder(self._as_array() * c, mod))
+        return Poly._from_reduced([ai * c % mod for ai in self.a])
 
     def __rmul__(self, c):
         if isinstance(c, int):
@@ -129,6 +193,35 @@ class Poly:
             return self._scalar_mul(other)
         if not isinstance(other, Poly):
             return NotImplemented
+        return self._ring_mul(other)
+
+    def _mul_poly(self, other: "Poly"):
+        if Poly._mod != other._mod or Poly._deg != other._deg:
+            raise ValueError("Various ring parameters for operands")
+        return self._ring_mul(other)
+
+    def to_ntt(self):
+        if Poly._ntt is None:
+            return self
+        return PolyNTT._wrap(ntt.negacyclic_ntt(self.a, Poly._ntt), Poly._ntt)
+
+    def to_poly(self):
+        return self
+
+    def _ring_mul(self, other):
+        if isinstance(other, PolyNTT):
+            return other._ring_mul(self)
+        if Poly._ntt is not None:
+            return self._mul_ntt(other)
+        return self._mul_schoolbook(other)
+
+    def _mul_ntt(self, other):
+        if Poly._use_np:
+            return Poly._from_reduced(ntt.negacyclic_convolution_np(self._as_array(), other._as_array(),
+                                                                    Poly._ntt))
+        return Poly._from_reduced(ntt.negacyclic_convolution_plan(self.a, other.a, Poly._ntt))
+
+    def _mul_schoolbook(self, other):
         mod = Poly._mod
         deg = Poly._deg
         a = self.a
@@ -148,30 +241,112 @@ class Poly:
                     acc[k - deg] = (acc[k - deg] - prod) % mod
         return Poly(acc)
 
-    def _mul_poly(self, other: "Poly"):
-        if Poly._mod != other._mod or Poly._deg != other._deg:
-            raise ValueError("Various ring parameters for operands")
-        mod, deg = Poly._mod, Poly._deg
-        acc = [0] * deg
-        A, B = self.a, other.a
-        for i in range(deg):
-            ai = A[i]
-            if ai == 0:
-                continue
-            for j in range(deg):
-                bj = B[j]
-                if bj == 0:
-                    continue
-                k = i + j
-                prod = mul_mod(ai, bj, mod)
-                if k < deg:
-                    acc[k] = add_mod(acc[k], prod, mod)
-                else:
-                    kd = k - deg
-                    acc[kd] = sub_mod(acc[kd], prod, mod)
-        return Poly(acc)
-
     def __eq__(self, other: object):
         if not isinstance(other, Poly):
             return False
         return Poly._mod == other._mod and Poly._deg == other._deg and self.a == other.a
+
+
+class PolyNTT(Poly):
+    def __init__(self, values: Iterable[int]):
+        if Poly._ntt is None:
+            raise RuntimeError("PolyNTT needs an NTT-friendly ring, see Poly.ring(q, d)")
+        plan = Poly._ntt
+        v = [int(x) % plan.q for x in values]
+        if len(v) != plan.n:
+            raise ValueError("PolyNTT: expected exactly d NTT-domain values")
+        self._hat = v
+        self._plan = plan
+        self._coeffs = None
+
+    @classmethod
+    def _wrap(cls, hat, plan):
+        obj = cls.__new__(cls)
+        obj._hat = hat
+        obj._plan = plan
+        obj._coeffs = None
+        return obj
+
+    @classmethod
+    def from_poly(cls, p):
+        return p.to_ntt()
+
+    @classmethod
+    def zero(cls):
+        return Poly.zero().to_ntt()
+
+    @classmethod
+    def one(cls):
+        return Poly.one().to_ntt()
+
+    @classmethod
+    def from_list(cls, coeffs):
+        return Poly(coeffs).to_ntt()
+
+    @classmethod
+    def random(cls):
+        return Poly.random().to_ntt()
+
+    def _as_array(self):
+        return np.array(self.a, dtype=np.int64)
+
+    @property
+    def a(self):
+        if self._coeffs is None:
+            self._coeffs = ntt.negacyclic_intt(self._hat, self._plan)
+        return self._coeffs
+
+    def to_ntt(self):
+        return self
+
+    def to_poly(self):
+        return Poly._from_reduced(list(self.a))
+
+    def ntt_values(self) -> List[int]:
+        return list(self._hat)
+
+    def _check_plan(self, other):
+        if not _same_ring(self._plan, other._plan):
+            raise ValueError("Various ring parameters for operands")
+
+    def __add__(self, other):
+        if not isinstance(other, PolyNTT):
+            return Poly.__add__(self, other)
+        self._check_plan(other)
+        mod = self._plan.q
+        return PolyNTT._wrap([(x + y) % mod for x, y in zip(self._hat, other._hat)], self._plan)
+
+    def __sub__(self, other):
+        if not isinstance(other, PolyNTT):
+            return Poly.__sub__(self, other)
+        self._check_plan(other)
+        mod = self._plan.q
+        return PolyNTT._wrap([(x - y) % mod for x, y in zip(self._hat, other._hat)], self._plan)
+
+    def __neg__(self):
+        mod = self._plan.q
+        return PolyNTT._wrap([(-x) % mod for x in self._hat], self._plan)
+
+    def _scalar_mul(self, c):
+        mod = self._plan.q
+        c %= mod
+        return PolyNTT._wrap([x * c % mod for x in self._hat], self._plan)
+
+    def _ring_mul(self, other):
+        if not isinstance(other, PolyNTT):
+            other = other.to_ntt()
+        self._check_plan(other)
+        mod = self._plan.q
+        return PolyNTT._wrap([x * y % mod for x, y in zip(self._hat, other._hat)], self._plan)
+
+    def inverse(self):
+        return PolyNTT._wrap(inv_mod_batch(self._hat, self._plan.q), self._plan)
+
+    def __repr__(self):
+        return f"PolyNTT({self.a!r}; q={self._plan.q}, d={self._plan.n})"
+
+
+def poly_inverse_mod_q(f):
+    if Poly._ntt is None:
+        raise RuntimeError("poly_inverse_mod_q needs an NTT-friendly ring, see Poly.ring(q, d)")
+    return f.to_ntt().inverse().to_poly()
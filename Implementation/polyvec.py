@@ -0,0 +1,181 @@
+from typing import Iterable, List
+
+import ntt
+from cache import LRUCache
+from poly import Poly, PolyNTT, _same_ring, np
+
+
+_MATRIX_CACHE = LRUCache(capacity=16)
+
+
+def _fused_sum(terms):
+    mod = Poly._mod
+    if Poly._use_np:
+        acc = terms[0]._as_array()
+        for t in terms[1:]:
+            acc = acc + t._as_array()
+        return Poly._from_reduced(np.remainder(acc, mod))
+    acc = terms[0].a
+    for t in terms[1:]:
+        acc = [x + y for x, y in zip(acc, t.a)]
+    return Poly._from_reduced([x % mod for x in acc])
+
+
+def _fused_dot(row, vec):
+    if Poly._ntt is None:
+        return _fused_sum([a._ring_mul(b) for a, b in zip(row, vec)])
+    row = [a.to_ntt() for a in row]
+    vec = [b.to_ntt() for b in vec]
+    plan = row[0]._plan
+    mod = plan.q
+    acc = [0] * plan.n
+    for a, b in zip(row, vec):
+        if not (_same_ring(a._plan, plan) and _same_ring(b._plan, plan)):
+            raise ValueError("Various ring parameters for operands")
+        acc = [x + y * z for x, y, z in zip(acc, a._hat, b._hat)]
+    return PolyNTT._wrap([x % mod for x in acc], plan)
+
+
+class PolyVec:
+    def __init__(self, polys: Iterable[Poly]):
+        self.polys: List[Poly] = list(polys)
+
+    @classmethod
+    def zero(cls, k):
+        return cls(Poly.zero() for _ in range(k))
+
+    def __len__(self):
+        return len(self.polys)
+
+    def __iter__(self):
+        return iter(self.polys)
+
+    def __getitem__(self, i):
+        return self.polys[i]
+
+    def _check_len(self, other):
+        if len(self.polys) != len(other):
+            raise ValueError("PolyVec: size mismatch")
+
+    def __add__(self, other):
+        if not isinstance(other, PolyVec):
+            return NotImplemented
+        self._check_len(other)
+        return PolyVec(a + b for a, b in zip(self.polys, other.polys))
+
+    def __sub__(self, other):
+        if not isinstance(other, PolyVec):
+            return NotImplemented
+        self._check_len(other)
+        return PolyVec(a - b for a, b in zip(self.polys, other.polys))
+
+    def __neg__(self):
+        return PolyVec(-a for a in self.polys)
+
+    def dot(self, other):
+        self._check_len(other)
+        return _fused_dot(self.polys, list(other))
+
+    def to_ntt(self):
+        return PolyVec(p.to_ntt() for p in self.polys)
+
+    def to_poly(self):
+        return PolyVec(p.to_poly() for p in self.polys)
+
+    def to_lists(self) -> List[List[int]]:
+        return [p.to_list() for p in self.polys]
+
+    def __eq__(self, other):
+        if not isinstance(other, PolyVec):
+            return False
+        return self.polys == other.polys
+
+    def __repr__(self):
+        return f"PolyVec({self.polys!r})"
+
+
+class PolyMatrix:
+    def __init__(self, rows: Iterable[Iterable[Poly]]):
+        self.rows: List[List[Poly]] = [list(r) for r in rows]
+        self._np_hat = None
+        if any(len(r) != len(self.rows[0]) for r in self.rows):
+            raise ValueError("PolyMatrix: rows must have the same length")
+
+    @property
+    def shape(self):
+        return len(self.rows), (len(self.rows[0]) if self.rows else 0)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __getitem__(self, i):
+        return self.rows[i]
+
+    def to_ntt(self):
+        return PolyMatrix([p.to_ntt() for p in r] for r in self.rows)
+
+    def to_poly(self):
+        return PolyMatrix([p.to_poly() for p in r] for r in self.rows)
+
+    def _rebind(self, plan):
+        return PolyMatrix([PolyNTT._wrap(p._hat, plan) for p in r] for r in self.rows)
+
+    def matvec(self, vec):
+        if self.shape[1] != len(vec):
+            raise ValueError("PolyMatrix.matvec: size mismatch")
+        if Poly._use_np and Poly._ntt is not None:
+            return self._matvec_np(vec)
+        vec = [b.to_ntt() for b in vec]
+        return PolyVec(_fused_dot(row, vec) for row in self.rows)
+
+    def matvec_many(self, vecs):
+        vecs = list(vecs)
+        if any(self.shape[1] != len(v) for v in vecs):
+            raise ValueError("PolyMatrix.matvec: size mismatch")
+        if not (Poly._use_np and Poly._ntt is not None and vecs):
+            return [self.matvec(v) for v in vecs]
+        plan = Poly._ntt
+        s = np.array([[b._as_array() for b in v] for v in vecs], dtype=np.int64)
+        s_hat = ntt.ntt_batch(s, plan)
+        t = ntt.intt_batch(ntt.pointwise_mac_batch(self._np_hat_for(plan), s_hat[:, None], plan.q), plan)
+        return [PolyVec(Poly._from_reduced(row) for row in rows) for rows in t]
+
+    def _np_hat_for(self, plan):
+        if self._np_hat is None or self._np_hat[0] is not plan:
+            coeffs = np.array([[p.a for p in r] for r in self.rows], dtype=np.int64)
+            self._np_hat = (plan, ntt.ntt_batch(coeffs, plan))
+        return self._np_hat[1]
+
+    def _matvec_np(self, vec):
+        plan = Poly._ntt
+        s_hat = ntt.ntt_batch(np.stack([b._as_array() for b in vec]), plan)
+        t = ntt.intt_batch(ntt.pointwise_mac_batch(self._np_hat_for(plan), s_hat, plan.q), plan)
+        return PolyVec(Poly._from_reduced(row) for row in t)
+
+    def __repr__(self):
+        return f"PolyMatrix({self.rows!r})"
+
+
+def cached_matrix(tag, rho, build):
+    key = (tag, Poly._mod, Poly._deg, bytes(rho))
+    mat = _MATRIX_CACHE.get_or_build(key, lambda: build(rho).to_ntt())
+    plan = Poly._ntt
+    if plan is not None and mat.rows and mat.rows[0] and mat.rows[0][0]._plan is not plan:
+        mat = mat._rebind(plan)
+        _MATRIX_CACHE.put(key, mat)
+    return mat
+
+
+def matrix_cache_info():
+    return _MATRIX_CACHE.info()
+
+
+def matrix_cache_clear():
+    _MATRIX_CACHE.clear()
+
+
+def set_matrix_cache_capacity(capacity):
+    _MATRIX_CACHE.resize(capacity)
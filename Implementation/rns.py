@@ -0,0 +1,162 @@
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import ntt
+from cache import LRUCache
+from modular import inv_mod
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+RNS_PRIME_BITS = 31
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+_BASIS_CACHE = LRUCache(capacity=8)
+
+
+def is_prime(n):
+    if n < 2:
+        return False
+    for p in _MR_BASES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def ntt_primes(deg, count, bits=RNS_PRIME_BITS):
+    step = 2 * deg
+    p = ((1 << bits) - 2) // step * step + 1
+    out: List[int] = []
+    while len(out) < count:
+        if p < step:
+            raise ValueError(f"not enough {bits}-bit NTT-friendly primes for deg={deg}")
+        if is_prime(p):
+            out.append(p)
+        p -= step
+    return out
+
+
+@dataclass
+class RNSBasis:
+    deg: int
+    primes: Tuple[int, ...]
+    plans: Tuple[ntt.NTTPlan, ...] = field(repr=False)
+    modulus: int = field(repr=False)
+    crt: Tuple[int, ...] = field(repr=False)
+
+    @property
+    def bits(self):
+        return self.modulus.bit_length() - 2
+
+    def reconstruct(self, residues):
+        M = self.modulus
+        half = M // 2
+        out = []
+        for column in zip(*residues):
+            x = sum(r * e for r, e in zip(column, self.crt)) % M
+            out.append(x - M if x > half else x)
+        return out
+
+
+def build_rns_basis(deg, count, bits=RNS_PRIME_BITS):
+    primes = tuple(ntt_primes(deg, count, bits))
+    plans = tuple(ntt.build_ntt_plan(p, deg) for p in primes)
+    M = 1
+    for p in primes:
+        M *= p
+    crt = tuple((M // p) * inv_mod((M // p) % p, p) for p in primes)
+    return RNSBasis(deg, primes, plans, M, crt)
+
+
+def rns_basis(deg, bits):
+    count = max(1, -(-(int(bits) + 2) // (RNS_PRIME_BITS - 1)))
+    return _BASIS_CACHE.get_or_build((int(deg), count), lambda: build_rns_basis(deg, count))
+
+
+def rns_basis_cache_info():
+    return _BASIS_CACHE.info()
+
+
+def rns_basis_cache_clear():
+    _BASIS_CACHE.clear()
+
+
+class RNSPoly:
+    __slots__ = ("basis", "res", "_np")
+
+    def __init__(self, basis, res, use_np):
+        self.basis = basis
+        self.res = res
+        self._np = use_np
+
+    @classmethod
+    def from_ints(cls, coeffs, basis, use_np=None):
+        assert len(coeffs) == basis.deg, "coefficient count must match the basis degree"
+        if use_np is None:
+            use_np = np is not None
+        res = []
+        for p, plan in zip(basis.primes, basis.plans):
+            row = [x % p for x in coeffs]
+            res.append(ntt.ntt_batch(row, plan) if use_np else ntt.negacyclic_ntt(row, plan))
+        return cls(basis, res, use_np)
+
+    def to_ints(self):
+        rows = []
+        for row, plan in zip(self.res, self.basis.plans):
+            if self._np:
+                rows.append(ntt.intt_batch(row, plan).tolist())
+            else:
+                rows.append(ntt.negacyclic_intt(row, plan))
+        return self.basis.reconstruct(rows)
+
+    def _check(self, other):
+        if not isinstance(other, RNSPoly) or other.basis is not self.basis or other._np != self._np:
+            raise TypeError("RNSPoly operands must share the same basis and backend")
+
+    def _combine(self, other, op):
+        self._check(other)
+        res = []
+        for a, b, p in zip(self.res, other.res, self.basis.primes):
+            if self._np:
+                res.append(op(a, b) % p)
+            else:
+                res.append([op(x, y) % p for x, y in zip(a, b)])
+        return RNSPoly(self.basis, res, self._np)
+
+    def __add__(self, other):
+        return self._combine(other, lambda x, y: x + y)
+
+    def __sub__(self, other):
+        return self._combine(other, lambda x, y: x - y)
+
+    def __mul__(self, other):
+        return self._combine(other, lambda x, y: x * y)
+
+
+def _max_bits(num):
+    return max((abs(x).bit_length() for x in num), default=0)
+
+
+def rns_negacyclic_mul(num1, num2, use_np=None):
+    n = len(num1)
+    assert len(num2) == n
+    basis = rns_basis(n, _max_bits(num1) + _max_bits(num2) + n.bit_length())
+    a = RNSPoly.from_ints(num1, basis, use_np)
+    b = RNSPoly.from_ints(num2, basis, use_np)
+    return (a * b).to_ints()
@@ -4,8 +4,8 @@ from typing import List, Optional, Dict
 import math, os, struct
 
 from rng import HMACDRBG, sample_cbd_random
-from ntt import primitive_root_for, precompute_roots, precompute_twists
-from cfft import precompute_twiddles, bitrev_permutation as cfft_bitrev
+from ntt import NTTPlan, get_ntt_plan
+from cfft import CFFTPlan, get_cfft_plan
 
 
 @dataclass
@@ -19,26 +19,6 @@ class SampleParams:
     use_fft: bool = True
 
 
-@dataclass
-class NTTPlan:
-    q: int
-    n: int
-    psi: int
-    roots: List[int]
-    roots_inv: List[int]
-    bitrev: List[int]
-    tw_fwd: List[int]
-    tw_inv: List[int]
-
-
-@dataclass
-class CFFTPlan:
-    n: int
-    W: List[complex]
-    Winv: List[complex]
-    bitrev: List[int]
-
-
 @dataclass
 class CDTTable:
     sigma: float
@@ -57,16 +37,11 @@ class SamplerState:
 
 def make_ntt_plan(q, n):
     assert (q - 1) % (2 * n) == 0, "q-1 must be divisible by 2*n for negacyclic NTT"
-    psi = primitive_root_for(q, 2 * n)
-    roots, roots_inv, bitrev = precompute_roots(q, n, psi)
-    tw_fwd, tw_inv = precompute_twists(q, n, psi)
-    return NTTPlan(q, n, psi, roots, roots_inv, bitrev, tw_fwd, tw_inv)
+    return get_ntt_plan(q, n)
 
 
 def make_cfft_plan(n):
-    W, Winv = precompute_twiddles(n)
-    br = cfft_bitrev(n)
-    return CFFTPlan(n, W, Winv, br)
+    return get_cfft_plan(n)
 
 
 def gaussian_cdt_build(sigma, tailcut=10.0):
@@ -4,9 +4,10 @@ from sample_precomp import gaussian_cdt_build
 from cfft import hadamard_product, add_complex, sub_complex
 import hashlib
 from poly import Poly
+from polyvec import PolyMatrix, cached_matrix
 from params import q, n, k
 
-def expand_matrix(rho):
+def _build_matrix(rho):
     A = []
     for i in range(k):
         row = []
@@ -15,7 +16,11 @@ def expand_matrix(rho):
             coeffs = [b % q for b in seed]
             row.append(Poly(coeffs))
         A.append(row)
-    return A
+    return PolyMatrix(A)
+
+
+def expand_matrix(rho):
+    return cached_matrix("samplers_A", rho, _build_matrix)
 
 
 _CDT_CACHE: dict[float, object] = {}
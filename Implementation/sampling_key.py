@@ -0,0 +1,186 @@
+import math
+import struct
+from array import array
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from cfft import (fft_negacyclic, adj_fft, add_complex, sub_complex, hadamard_product, div_fft,
+                  split_fft)
+from params import q
+
+
+SIGMA_SLACK = 1.05
+_MAGIC = b"SMK1"
+_HEADER = struct.Struct("<4sIIdd")
+
+FFTPair = Tuple[List[complex], List[complex]]
+
+
+def _sq_norm_fft(pair):
+    a, b = pair
+    return [abs(x) ** 2 + abs(y) ** 2 for x, y in zip(a, b)]
+
+
+def _inner_fft(u, v):
+    return add_complex(hadamard_product(u[0], adj_fft(v[0])), hadamard_product(u[1], adj_fft(v[1])))
+
+
+def gram_fft(b1, b2):
+    G00 = _inner_fft(b1, b1)
+    G01 = _inner_fft(b1, b2)
+    G11 = _inner_fft(b2, b2)
+    return [[G00, G01], [adj_fft(G01), G11]]
+
+
+def ldl_fft(G):
+    D00 = G[0][0]
+    L10 = div_fft(G[1][0], D00)
+    D11 = sub_complex(G[1][1], hadamard_product(hadamard_product(L10, adj_fft(L10)), D00))
+    return L10, D00, D11
+
+
+def ffldl_fft(G, deg):
+    L10, D00, D11 = ldl_fft(G)
+    if deg == 2:
+        return [L10, D00[0].real, D11[0].real]
+    d00, d01 = split_fft(D00)
+    d10, d11 = split_fft(D11)
+    G0 = [[d00, d01], [adj_fft(d01), d00]]
+    G1 = [[d10, d11], [adj_fft(d11), d10]]
+    return [L10, ffldl_fft(G0, deg // 2), ffldl_fft(G1, deg // 2)]
+
+
+def normalize_tree(tree, sigma):
+    L10, left, right = tree
+    if isinstance(left, float):
+        return [L10, sigma / math.sqrt(left), sigma / math.sqrt(right)]
+    return [L10, normalize_tree(left, sigma), normalize_tree(right, sigma)]
+
+
+@dataclass
+class SamplingKey:
+    n: int
+    q: int
+    sigma: float
+    eta: float
+    f: List[int] = field(repr=False)
+    g: List[int] = field(repr=False)
+    F: List[int] = field(repr=False)
+    G: List[int] = field(repr=False)
+    b1_fft: FFTPair = field(repr=False)
+    b2_fft: FFTPair = field(repr=False)
+    b2_tilde_fft: FFTPair = field(repr=False)
+    beta1_fft: FFTPair = field(repr=False)
+    beta2_fft: FFTPair = field(repr=False)
+    Sigma1_fft: List[float] = field(repr=False)
+    Sigma2_fft: List[float] = field(repr=False)
+    tree: list = field(repr=False)
+
+    @property
+    def d(self):
+        return self.n // 2
+
+    def to_bytes(self):
+        out = [_HEADER.pack(_MAGIC, self.n, self.q, self.sigma, self.eta)]
+        out.append(struct.pack(f"<{4 * self.n}i", *self.f, *self.g, *self.F, *self.G))
+        floats = array("d")
+        for pair in (self.b1_fft, self.b2_fft, self.b2_tilde_fft, self.beta1_fft, self.beta2_fft):
+            for vec in pair:
+                _pack_complex(floats, vec)
+        floats.extend(self.Sigma1_fft)
+        floats.extend(self.Sigma2_fft)
+        _pack_tree(floats, self.tree)
+        if struct.pack("=H", 1) != struct.pack("<H", 1):
+            floats.byteswap()
+        out.append(floats.tobytes())
+        return b"".join(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < _HEADER.size:
+            raise ValueError("SamplingKey.from_bytes: truncated header")
+        magic, n, mod, sigma, eta = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("SamplingKey.from_bytes: bad magic")
+        if n < 2 or n & (n - 1):
+            raise ValueError(f"SamplingKey.from_bytes: bad degree {n}")
+        size = _HEADER.size + 16 * n + 8 * (11 * n + _tree_floats(n))
+        if len(data) != size:
+            raise ValueError(f"SamplingKey.from_bytes: expected {size} bytes, got {len(data)}")
+        pos = _HEADER.size
+        ints = struct.unpack_from(f"<{4 * n}i", data, pos)
+        pos += 16 * n
+        floats = array("d")
+        floats.frombytes(data[pos:])
+        if struct.pack("=H", 1) != struct.pack("<H", 1):
+            floats.byteswap()
+        d = n // 2
+        it = iter(floats)
+        pairs = [(_unpack_complex(it, d), _unpack_complex(it, d)) for _ in range(5)]
+        Sigma1 = [next(it) for _ in range(d)]
+        Sigma2 = [next(it) for _ in range(d)]
+        tree = _unpack_tree(it, n)
+        basis = [list(ints[i * n:(i + 1) * n]) for i in range(4)]
+        return cls(n, mod, sigma, eta, *basis, *pairs, Sigma1, Sigma2, tree)
+
+
+def _pack_complex(floats, vec):
+    for z in vec:
+        floats.append(z.real)
+        floats.append(z.imag)
+
+
+def _unpack_complex(it, count):
+    return [complex(next(it), next(it)) for _ in range(count)]
+
+
+def _pack_tree(floats, tree):
+    L10, left, right = tree
+    _pack_complex(floats, L10)
+    if isinstance(left, float):
+        floats.append(left)
+        floats.append(right)
+        return
+    _pack_tree(floats, left)
+    _pack_tree(floats, right)
+
+
+def _tree_floats(deg):
+    if deg == 2:
+        return deg + 2
+    return deg + 2 * _tree_floats(deg // 2)
+
+
+def _unpack_tree(it, deg):
+    L10 = _unpack_complex(it, deg // 2)
+    if deg == 2:
+        return [L10, next(it), next(it)]
+    return [L10, _unpack_tree(it, deg // 2), _unpack_tree(it, deg // 2)]
+
+
+def expand_sampling_key(f, g, F, G, eta, sigma=None, mod=q):
+    n = len(f)
+    assert n >= 2 and n == len(g) == len(F) == len(G), "basis polynomials must share a degree >= 2"
+    b1 = (fft_negacyclic(g), [-x for x in fft_negacyclic(f)])
+    b2 = (fft_negacyclic(G), [-x for x in fft_negacyclic(F)])
+
+    gram = gram_fft(b1, b2)
+    mu = div_fft(gram[1][0], gram[0][0])
+    b2_tilde = (sub_complex(b2[0], hadamard_product(mu, b1[0])),
+                sub_complex(b2[1], hadamard_product(mu, b1[1])))
+
+    n1 = _sq_norm_fft(b1)
+    n2 = _sq_norm_fft(b2_tilde)
+    if sigma is None:
+        sigma = SIGMA_SLACK * eta * math.sqrt(max(max(n1), max(n2)))
+    if sigma * sigma <= eta * eta * max(max(n1), max(n2)):
+        raise ValueError("expand_sampling_key: sigma too small for this basis")
+
+    beta1 = tuple([x.conjugate() / s for x, s in zip(vec, n1)] for vec in b1)
+    beta2 = tuple([x.conjugate() / s for x, s in zip(vec, n2)] for vec in b2_tilde)
+    Sigma1 = [math.sqrt(sigma * sigma / s - eta * eta) for s in n1]
+    Sigma2 = [math.sqrt(sigma * sigma / s - eta * eta) for s in n2]
+
+    tree = normalize_tree(ffldl_fft(gram, n), sigma)
+    return SamplingKey(n, mod, float(sigma), float(eta), list(f), list(g), list(F), list(G),
+                       b1, b2, b2_tilde, beta1, beta2, Sigma1, Sigma2, tree)
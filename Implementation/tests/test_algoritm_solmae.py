@@ -1,8 +1,25 @@
 import unittest
+import hashlib
+from unittest.mock import patch
 
-from algoritm_solmae import keygen_solmae, sign_solmae, verify_solmae
+import algoritm_solmae
+import ntt
+import polyvec
+from algoritm_solmae import (keygen_solmae, sign_solmae, verify_solmae, SigningKey, VerifyingKey,
+                             verifying_key_for, verifying_key_cache_info, verifying_key_cache_clear,
+                             set_verifying_key_cache_capacity, verify_batch,
+                             sign_batch)
 from params import n, k, q, d
-from poly import Poly
+from poly import Poly, PolyNTT
+
+
+def deterministic_bytes(seed):
+    counter = [0]
+
+    def gen(nbytes):
+        counter[0] += 1
+        return hashlib.shake_256(seed + counter[0].to_bytes(4, "big")).digest(nbytes)
+    return gen
 
 
 class TestAlgoritmSolmae(unittest.TestCase):
@@ -93,3 +110,163 @@ class TestAlgoritmSolmae(unittest.TestCase):
         for _ in range(3):
             self.assertTrue(verify_solmae(pk, self.msg, sig))
 
+    def test_sign_verify_after_plan_eviction(self):
+        pk, sk = keygen_solmae()
+        for deg in (2, 4, 8, 16, 32, 64, 128, 512, 1024):
+            Poly.ring(q, deg)
+        Poly.ring(q, n)
+        sig = sign_solmae(sk, self.msg)
+        self.assertTrue(verify_solmae(pk, self.msg, sig))
+
+
+class TestSigningKey(unittest.TestCase):
+    def setUp(self):
+        self.msg = b"solmae signing key message"
+
+    def test_sign_matches_sign_solmae(self):
+        pk, sk = keygen_solmae()
+        signer = SigningKey(sk)
+        self.assertIs(signer.tr, sk[3])
+        A = signer.A
+        self.assertTrue(all(isinstance(p, PolyNTT) for row in A for p in row))
+        polyvec.matrix_cache_clear()
+
+        with patch("rng.random_bytes_sys", side_effect=deterministic_bytes(b"seed")):
+            sig_ref = sign_solmae(sk, self.msg)
+        with patch("rng.random_bytes_sys", side_effect=deterministic_bytes(b"seed")):
+            sig_key = signer.sign(self.msg)
+        self.assertEqual(sig_key, sig_ref)
+        self.assertIs(signer.A, A)
+
+    def test_sign_many_messages_verify(self):
+        pk, sk = keygen_solmae()
+        signer = SigningKey(sk)
+        for i in range(3):
+            msg = self.msg + bytes([i])
+            self.assertTrue(verify_solmae(pk, msg, signer.sign(msg)))
+
+    def test_signs_after_plan_eviction(self):
+        pk, sk = keygen_solmae()
+        signer = SigningKey(sk)
+        held = signer.A
+        ntt.ntt_plan_cache_clear()
+        Poly._mod = None
+        Poly.ring(q, n)
+        self.assertTrue(all(p._plan is not Poly._ntt for row in held for p in row))
+        for i in range(2):
+            msg = self.msg + bytes([i])
+            self.assertTrue(verify_solmae(pk, msg, signer.sign(msg)))
+            self.assertTrue(verify_solmae(pk, msg, signer.sign_many([msg])[0]))
+        self.assertIs(signer.A, held)
+
+
+class TestVerifyingKey(unittest.TestCase):
+    def setUp(self):
+        self.msg = b"solmae verifying key message"
+        verifying_key_cache_clear()
+
+    def tearDown(self):
+        set_verifying_key_cache_capacity(32)
+        verifying_key_cache_clear()
+
+    def test_verify_matches_verify_solmae(self):
+        pk, sk = keygen_solmae()
+        vk = VerifyingKey(pk)
+        self.assertEqual(vk.tr, sk[3])
+        sig = sign_solmae(sk, self.msg)
+        self.assertTrue(vk.verify(self.msg, sig))
+        self.assertFalse(vk.verify(self.msg + b"!", sig))
+        self.assertFalse(vk.verify(self.msg, (sig[0][:1], sig[1], sig[2])))
+
+    def test_verify_solmae_uses_cache(self):
+        pk, sk = keygen_solmae()
+        sig = sign_solmae(sk, self.msg)
+        for _ in range(3):
+            self.assertTrue(verify_solmae(pk, self.msg, sig))
+        info = verifying_key_cache_info()
+        self.assertEqual((info.hits, info.misses, info.size), (2, 1, 1))
+        self.assertIs(verifying_key_for(pk), verifying_key_for((pk[0], list(pk[1]))))
+
+    def test_cache_is_bounded(self):
+        set_verifying_key_cache_capacity(1)
+        pk1, _ = keygen_solmae()
+        pk2, _ = keygen_solmae()
+        verifying_key_for(pk1)
+        verifying_key_for(pk2)
+        self.assertEqual(verifying_key_cache_info().size, 1)
+
+
+class TestVerifyBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.keys = [keygen_solmae() for _ in range(2)]
+        cls.items = []
+        cls.expected = []
+        for i in range(6):
+            pk, sk = cls.keys[i % 2]
+            msg = b"batch message %d" % i
+            sig = sign_solmae(sk, msg)
+            if i % 3 == 2:
+                msg += b" (tampered)"
+            cls.items.append((pk, msg, sig))
+            cls.expected.append(i % 3 != 2)
+        other_pk = cls.keys[1][0]
+        cls.items.append((other_pk, cls.items[0][1], cls.items[0][2]))
+        cls.expected.append(False)
+        cls.items.append((cls.keys[0][0], b"malformed", (None, b"", [])))
+        cls.expected.append(False)
+
+    def test_sequential_results_in_input_order(self):
+        self.assertEqual(verify_batch(self.items), self.expected)
+
+    def test_process_pool_results_in_input_order(self):
+        self.assertEqual(verify_batch(self.items, workers=2), self.expected)
+
+    def test_empty_batch(self):
+        self.assertEqual(verify_batch([], workers=2), [])
+
+    def test_malformed_public_keys(self):
+        rho = self.keys[0][0][0]
+        bad = [(None, b"m", self.items[0][2]), ((rho, None), b"m", self.items[0][2])]
+        items = bad[:1] + self.items + bad[1:]
+        expected = [False] + self.expected + [False]
+        self.assertEqual(verify_batch(items), expected)
+        self.assertEqual(verify_batch(items, workers=2), expected)
+
+
+class TestSignBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pk, cls.sk = keygen_solmae()
+        cls.msgs = [b"sign batch %d" % i for i in range(5)]
+
+    def test_matches_sign_solmae_per_message(self):
+        with patch("rng.random_bytes_sys", side_effect=deterministic_bytes(b"batch")):
+            ref = [sign_solmae(self.sk, m) for m in self.msgs]
+        with patch("rng.random_bytes_sys", side_effect=deterministic_bytes(b"batch")):
+            got = sign_batch(self.sk, iter(self.msgs), chunk_size=2)
+        self.assertEqual(got, ref)
+
+    def test_process_pool_signatures_verify_in_order(self):
+        sigs = sign_batch(self.sk, self.msgs, workers=2, chunk_size=2)
+        self.assertEqual(len(sigs), len(self.msgs))
+        self.assertEqual(verify_batch([(self.pk, m, s) for m, s in zip(self.msgs, sigs)]),
+                         [True] * len(self.msgs))
+        self.assertFalse(verify_solmae(self.pk, self.msgs[0], sigs[1]))
+
+    def test_serial_batch_expands_matrix_once(self):
+        polyvec.matrix_cache_clear()
+        polyvec.set_matrix_cache_capacity(1)
+        try:
+            with patch("algoritm_solmae._expand_matrix_A", wraps=algoritm_solmae._expand_matrix_A) as expand:
+                sigs = sign_batch(self.sk, self.msgs, chunk_size=2)
+            self.assertEqual(expand.call_count, 1)
+            self.assertEqual(polyvec.matrix_cache_info().misses, 1)
+        finally:
+            polyvec.set_matrix_cache_capacity(16)
+        self.assertEqual(verify_batch([(self.pk, m, s) for m, s in zip(self.msgs, sigs)]),
+                         [True] * len(self.msgs))
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            sign_batch(self.sk, self.msgs, chunk_size=0)
@@ -0,0 +1,44 @@
+import unittest
+
+from cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_hits_misses_and_build_once(self):
+        cache = LRUCache(4)
+        calls = []
+
+        def build():
+            calls.append(1)
+            return "value"
+
+        self.assertEqual(cache.get_or_build("k", build), "value")
+        self.assertEqual(cache.get_or_build("k", build), "value")
+        self.assertEqual(len(calls), 1)
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.size, info.capacity), (1, 1, 1, 4))
+
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.info().misses, 2)
+
+    def test_lru_eviction_order(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_resize_and_clear(self):
+        cache = LRUCache(3)
+        for i in range(3):
+            cache.put(i, i)
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertIn(2, cache)
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 0, 1))
+        with self.assertRaises(ValueError):
+            cache.resize(0)
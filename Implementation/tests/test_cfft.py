@@ -122,3 +122,191 @@ class TestCFFT(unittest.TestCase):
         self.assertTrue(cfft.is_close_vec(cfft.add_complex(A, Z), A, tol=EPS))
         self.assertTrue(cfft.is_close_vec(cfft.sub_complex(A, Z), A, tol=EPS))
         self.assertTrue(cfft.is_close_vec(cfft.scale_complex(A, 1+0j), A, tol=EPS))
+
+    def test_plan_registry_reuses_plans(self):
+        cfft.cfft_plan_cache_clear()
+        p1 = cfft.get_cfft_plan(64)
+        p2 = cfft.get_cfft_plan(64)
+        self.assertIs(p1, p2)
+        info = cfft.cfft_plan_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+        cfft.fft(rand_complex_vec(64))
+        self.assertEqual(cfft.cfft_plan_cache_info().hits, 2)
+
+    def test_plan_registry_holds_every_level(self):
+        cfft.cfft_plan_cache_clear()
+        sizes = [1 << i for i in range(10, -1, -1)]
+        for _ in range(3):
+            for size in sizes:
+                cfft.get_cfft_plan(size)
+        self.assertEqual(cfft.cfft_plan_cache_info().misses, len(sizes))
+        try:
+            cfft.set_cfft_plan_cache_capacity(2)
+            self.assertEqual(cfft.cfft_plan_cache_info().size, 2)
+        finally:
+            cfft.set_cfft_plan_cache_capacity(16)
+
+    def test_stage_twiddles_are_exact(self):
+        n = 256
+        plan = cfft.get_cfft_plan(n)
+        self.assertEqual([len(t) for t in plan.stages], [1, 2, 4, 8, 16, 32, 64, 128])
+        for s, tw in enumerate(plan.stages):
+            length = 2 << s
+            for j, w in enumerate(tw):
+                self.assertLessEqual(abs(w - cmath.exp(-2j * math.pi * j / length)), 1e-15)
+
+    def test_large_roundtrip_accuracy(self):
+        n = 1024
+        x = rand_complex_vec(n)
+        self.assertLessEqual(cfft.max_abs_diff(cfft.ifft(cfft.fft(x)), x), 1e-14)
+
+
+def negacyclic_mul_ref(num1, num2):
+    n = len(num1)
+    out = [0] * n
+    for i in range(n):
+        for j in range(n):
+            if i + j < n:
+                out[i + j] += num1[i] * num2[j]
+            else:
+                out[i + j - n] -= num1[i] * num2[j]
+    return out
+
+
+class TestNegacyclicFFT(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        random.seed(2026)
+
+    def test_evaluates_at_odd_roots(self):
+        n = 16
+        f = rand_real_vec(n, scale=3.0)
+        F = cfft.fft_negacyclic(f)
+        self.assertEqual(len(F), n // 2)
+        for m, val in enumerate(F):
+            root = cmath.exp(1j * math.pi * (4 * m + 1) / n)
+            ref = sum(f[j] * root ** j for j in range(n))
+            self.assertLessEqual(abs(val - ref), 1e-9)
+
+    def test_roundtrip_and_ring_ops(self):
+        for n in (2, 8, 256):
+            a = [random.randint(-20, 20) for _ in range(n)]
+            b = [random.randint(-20, 20) for _ in range(n)]
+            A, B = cfft.fft_negacyclic(a), cfft.fft_negacyclic(b)
+            self.assertLessEqual(cfft.max_abs_diff(cfft.ifft_negacyclic(A), a), 1e-9)
+            prod = cfft.ifft_negacyclic(cfft.hadamard_product(A, B))
+            self.assertLessEqual(cfft.max_abs_diff(prod, negacyclic_mul_ref(a, b)), 1e-7)
+            total = cfft.ifft_negacyclic(cfft.add_complex(A, B))
+            self.assertLessEqual(cfft.max_abs_diff(total, [x + y for x, y in zip(a, b)]), 1e-9)
+            diff = cfft.ifft_negacyclic(cfft.sub_complex(A, B))
+            self.assertLessEqual(cfft.max_abs_diff(diff, [x - y for x, y in zip(a, b)]), 1e-9)
+
+    def test_adjoint_is_conjugate(self):
+        n = 32
+        a = [random.randint(-9, 9) for _ in range(n)]
+        adj = [a[0]] + [-x for x in reversed(a[1:])]
+        self.assertLessEqual(cfft.max_abs_diff(cfft.adj_fft(cfft.fft_negacyclic(a)), cfft.fft_negacyclic(adj)), 1e-9)
+
+    def test_split_merge_match_coefficient_split(self):
+        for n in (2, 4, 16, 128):
+            f = [random.randint(-30, 30) for _ in range(n)]
+            F = cfft.fft_negacyclic(f)
+            f0, f1 = cfft.split_fft(F)
+            if n == 2:
+                self.assertEqual((f0, f1), ([complex(f[0])], [complex(f[1])]))
+            else:
+                self.assertLessEqual(cfft.max_abs_diff(f0, cfft.fft_negacyclic(f[0::2])), 1e-9)
+                self.assertLessEqual(cfft.max_abs_diff(f1, cfft.fft_negacyclic(f[1::2])), 1e-9)
+            merged = cfft.merge_fft(f0, f1, n if n == 2 else None)
+            self.assertLessEqual(cfft.max_abs_diff(merged, F), 1e-9)
+
+    def test_recursive_split_to_coefficients(self):
+        n = 64
+        f = [random.randint(-30, 30) for _ in range(n)]
+
+        def leaves(F, deg):
+            if deg == 1:
+                return [F[0].real]
+            f0, f1 = cfft.split_fft(F)
+            l0, l1 = leaves(f0, deg // 2), leaves(f1, deg // 2)
+            out = [0.0] * deg
+            out[0::2], out[1::2] = l0, l1
+            return out
+
+        self.assertLessEqual(cfft.max_abs_diff(leaves(cfft.fft_negacyclic(f), n), f), 1e-9)
+
+    def test_div_inverts_mul(self):
+        n = 32
+        a = [random.randint(-9, 9) for _ in range(n)]
+        b = [random.randint(1, 9) for _ in range(n)]
+        A, B = cfft.fft_negacyclic(a), cfft.fft_negacyclic(b)
+        self.assertLessEqual(cfft.max_abs_diff(cfft.div_fft(cfft.hadamard_product(A, B), B), A), 1e-9)
+
+
+class TestComplexVec(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        random.seed(2027)
+
+    def test_roundtrip_and_indexing(self):
+        A = rand_complex_vec(16)
+        v = cfft.ComplexVec.from_complex(A)
+        self.assertEqual(len(v), 16)
+        self.assertEqual(v.to_complex(), A)
+        self.assertEqual(list(v), A)
+        v[3] = 2 - 5j
+        self.assertEqual(v[3], 2 - 5j)
+        self.assertEqual(v.re.typecode, "d")
+
+    def test_ops_match_list_versions(self):
+        n = 64
+        A, B = rand_complex_vec(n), rand_complex_vec(n)
+        a, b = cfft.ComplexVec.from_complex(A), cfft.ComplexVec.from_complex(B)
+        for fn in (cfft.hadamard_product, cfft.add_complex, cfft.sub_complex):
+            ref = fn(A, B)
+            self.assertLessEqual(cfft.max_abs_diff(fn(a, b).to_complex(), ref), 1e-15)
+            out = cfft.ComplexVec.zeros(n)
+            self.assertIs(fn(a, b, out=out), out)
+            self.assertLessEqual(cfft.max_abs_diff(out.to_complex(), ref), 1e-15)
+            lst = [0j] * n
+            self.assertIs(fn(A, B, out=lst), lst)
+            self.assertEqual(lst, ref)
+
+    def test_inplace_aliasing(self):
+        n = 32
+        A, B = rand_complex_vec(n), rand_complex_vec(n)
+        a, b = cfft.ComplexVec.from_complex(A), cfft.ComplexVec.from_complex(B)
+        self.assertIs(cfft.hadamard_inplace(a, b), a)
+        self.assertLessEqual(cfft.max_abs_diff(a.to_complex(), cfft.hadamard_product(A, B)), 1e-15)
+        c = cfft.ComplexVec.from_complex(A)
+        cfft.add_inplace(c, c)
+        self.assertLessEqual(cfft.max_abs_diff(c.to_complex(), [2 * z for z in A]), 1e-15)
+        cfft.sub_inplace(c, b)
+        self.assertLessEqual(cfft.max_abs_diff(c.to_complex(), [2 * x - y for x, y in zip(A, B)]), 1e-15)
+
+    def test_fft_inplace_interop(self):
+        n = 128
+        A = rand_complex_vec(n)
+        v = cfft.ComplexVec.from_complex(A)
+        W, Winv = cfft.precompute_twiddles(n)
+        perm = cfft.bitrev_permutation(n)
+        cfft.fft_inplace(v, W, perm)
+        self.assertLessEqual(cfft.max_abs_diff(v.to_complex(), cfft.fft(A)), 1e-12)
+        cfft.ifft_inplace(v, Winv, perm)
+        self.assertLessEqual(cfft.max_abs_diff(v.to_complex(), A), 1e-14)
+        plan = cfft.get_cfft_plan(n)
+        cfft.fft_plan_inplace(v, plan)
+        cfft.ifft_plan_inplace(v, plan)
+        self.assertLessEqual(cfft.max_abs_diff(v.to_complex(), A), 1e-14)
+
+    def test_fft_inplace_honours_tables(self):
+        n = 64
+        A = rand_complex_vec(n)
+        W, Winv = cfft.precompute_twiddles(n)
+        perm = cfft.bitrev_permutation(n)
+        a, v = list(A), cfft.ComplexVec.from_complex(A)
+        cfft.fft_inplace(a, Winv, perm)
+        cfft.fft_inplace(v, Winv, perm)
+        self.assertLessEqual(cfft.max_abs_diff(v.to_complex(), a), 1e-12)
+        self.assertLessEqual(cfft.max_abs_diff(a, [n * z for z in cfft.ifft(A)]), 1e-9)
+        self.assertIs(cfft._table_stages(Winv)[1], cfft._table_stages(Winv)[1])
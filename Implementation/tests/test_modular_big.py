@@ -97,5 +97,79 @@ class TestModularBig(unittest.TestCase):
                 self.assertEqual(mod.mul_mod(mod.mul_mod(num1, num2, mod_), num3, mod_),
                                  mod.mul_mod(num1, mod.mul_mod(num2, num3, mod_), mod_))
 
+    def test_inv_mod_batch_matches_inv_mod(self):
+        for mod_ in BIG_MODS + [12289]:
+            vals = [rand_big(512) % mod_ or 1 for _ in range(64)]
+            self.assertEqual(mod.inv_mod_batch(vals, mod_), [mod.inv_mod(v, mod_) for v in vals])
+        self.assertEqual(mod.inv_mod_batch([], 12289), [])
+        self.assertEqual(mod.inv_mod_batch([5], 12289), [mod.inv_mod(5, 12289)])
+
+    def test_inv_mod_batch_reports_zero_divisors(self):
+        with self.assertRaises(mod.NonInvertibleError) as ctx:
+            mod.inv_mod_batch([3, 0, 5, 12289 * 7], 12289)
+        self.assertEqual(ctx.exception.indices, [1, 3])
+        self.assertIsInstance(ctx.exception, ValueError)
+
+        with self.assertRaises(mod.NonInvertibleError) as ctx:
+            mod.inv_mod_batch([7, 6, 35, 11], 1001)
+        self.assertEqual(ctx.exception.indices, [0, 2, 3])
+
+
+class TestReductionKernels(unittest.TestCase):
+    Q = 12289
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(4242)
+
+    def test_lazy_variants(self):
+        q = self.Q
+        for _ in range(500):
+            a, b = random.randrange(q), random.randrange(q)
+            self.assertEqual(mod.add_mod_lazy(a, b, q), (a + b) % q)
+            self.assertEqual(mod.sub_mod_lazy(a, b, q), (a - b) % q)
+            self.assertEqual(mod.mul_mod_lazy(a, b, q), (a * b) % q)
+
+    def test_barrett_reduce(self):
+        for q in (self.Q, 7681, PRIME_61):
+            c = mod.barrett_const(q) if q != self.Q else mod.Q12289_BARRETT
+            for _ in range(300):
+                x = random.randrange(q) * random.randrange(q)
+                self.assertEqual(mod.barrett_reduce(x, c), x % q)
+
+    def test_montgomery_roundtrip_and_mul(self):
+        for q, c in ((self.Q, mod.Q12289_MONTGOMERY), (PRIME_127, mod.montgomery_const(PRIME_127))):
+            for _ in range(300):
+                a, b = random.randrange(q), random.randrange(q)
+                am, bm = mod.to_montgomery(a, c), mod.to_montgomery(b, c)
+                self.assertEqual(mod.from_montgomery(am, c), a)
+                self.assertEqual(mod.from_montgomery(mod.montgomery_mul(am, bm, c), c), a * b % q)
+        with self.assertRaises(ValueError):
+            mod.montgomery_const(1 << 16)
+
+    def test_shoup_constant_multiplication(self):
+        q = self.Q
+        for _ in range(100):
+            w = random.randrange(q)
+            ws = mod.shoup_precompute(w, q)
+            for _ in range(20):
+                a = random.randrange(1 << mod.SHOUP_BITS)
+                self.assertEqual(mod.mul_shoup(a, w, ws, q), a * w % q)
+
+    @unittest.skipUnless(mod.np is not None, "numpy is not installed")
+    def test_array_kernels(self):
+        np = mod.np
+        q = self.Q
+        a = np.array([random.randrange(q) for _ in range(1024)], dtype=np.int64)
+        b = np.array([random.randrange(q) for _ in range(1024)], dtype=np.int64)
+        x = a * b
+        self.assertEqual(mod.barrett_reduce_np(x.copy(), mod.Q12289_BARRETT).tolist(), (x % q).tolist())
+        c = mod.Q12289_MONTGOMERY
+        R_inv = pow(1 << c.r_bits, -1, q)
+        self.assertEqual(mod.montgomery_reduce_np(x.copy(), c).tolist(), (x * R_inv % q).tolist())
+        bs = np.array([mod.shoup_precompute(int(w), q) for w in b], dtype=np.int64)
+        self.assertEqual(mod.mul_shoup_np(a, b, bs, q).tolist(), (a * b % q).tolist())
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,61 @@
+import unittest
+import math
+
+import ntrugen
+import ntrusolve as ns
+
+
+Q = 12289
+
+
+def check_key(tc, key, deg):
+    f, g, F, G = key
+    lhs = ns.z_sub(ns.z_negacyclic_mul(f, G), ns.z_negacyclic_mul(g, F))
+    tc.assertEqual(lhs, [Q] + [0] * (deg - 1))
+
+
+class TestKeygenStats(unittest.TestCase):
+    def test_percentiles_and_summary(self):
+        stats = ntrugen.KeygenStats()
+        for i in range(1, 101):
+            stats.record(1 + i % 3, i / 100)
+        stats.rejections["quality"] += 5
+        summary = stats.summary()
+        self.assertEqual(summary["keys"], 100)
+        self.assertEqual(summary["latency_p50"], 0.5)
+        self.assertEqual(summary["latency_p99"], 0.99)
+        self.assertEqual(summary["attempts_hist"], {1: 33, 2: 34, 3: 33})
+        self.assertEqual(summary["rejections"], {"quality": 5})
+
+    def test_empty_summary(self):
+        summary = ntrugen.KeygenStats().summary()
+        self.assertEqual((summary["keys"], summary["latency_p99"], summary["attempts_max"]), (0, 0.0, 0))
+
+
+class TestNTRUKeygen(unittest.TestCase):
+    def test_gram_schmidt_norm_lower_bound(self):
+        f = [3, -1, 0, 2, 1, 0, -2, 1]
+        g = [1, 1, -1, 0, 2, -3, 0, 1]
+        gs = ntrugen.gram_schmidt_norm(f, g, Q)
+        self.assertGreaterEqual(gs, math.sqrt(sum(x * x for x in f + g)))
+
+    def test_serial_keygen_satisfies_ntru_equation(self):
+        keys, stats = ntrugen.ntru_keygen_many(3, deg=32)
+        self.assertEqual(len(keys), 3)
+        for key in keys:
+            check_key(self, key, 32)
+        self.assertEqual(len(stats.attempts), 3)
+        self.assertEqual(sum(stats.attempts) - 3, sum(stats.rejections.values()))
+
+    def test_speculative_keygen_with_pool(self):
+        stats = ntrugen.KeygenStats()
+        key = ntrugen.ntru_keygen(deg=32, workers=2, stats=stats)
+        check_key(self, key, 32)
+        self.assertEqual(len(stats.latencies), 1)
+        self.assertGreater(stats.summary()["latency_max"], 0.0)
+
+    def test_rejects_non_ntt_ring_and_gives_up(self):
+        with self.assertRaises(ValueError):
+            ntrugen.ntru_keygen(mod=12289, deg=24)
+        with self.assertRaises(RuntimeError):
+            ntrugen.ntru_keygen(deg=16, bound=0.1, max_attempts=3)
@@ -37,6 +37,24 @@ class TestZArithmetic(unittest.TestCase):
                 ref = ref_negacyclic_mul(num1, num2)
                 self.assertEqual(got, ref)
 
+    def test_kronecker_matches_reference(self):
+        for n in (1, 2, 8, 16, 64):
+            for bits in (3, 70, 900):
+                num1 = rand_vec(n, -(1 << bits), 1 << bits)
+                num2 = rand_vec(n, -(1 << bits), 1 << bits)
+                num2[0] = 0
+                ref = ref_negacyclic_mul(num1, num2)
+                self.assertEqual(ns.z_negacyclic_mul_kronecker(num1, num2), ref)
+                self.assertEqual(ns.z_negacyclic_mul(num1, num2), ref)
+
+    def test_kronecker_extreme_and_zero_inputs(self):
+        n = 32
+        big = 1 << 2000
+        num1 = [big if i % 2 else -big for i in range(n)]
+        num2 = [-big] * n
+        self.assertEqual(ns.z_negacyclic_mul_kronecker(num1, num2), ref_negacyclic_mul(num1, num2))
+        self.assertEqual(ns.z_negacyclic_mul_kronecker([0] * n, num2), [0] * n)
+
     def test_z_add_sub_scalar_identities(self):
         n = 16
         num1 = rand_vec(n, -10, 10)
@@ -150,3 +168,62 @@ class TestReduceAndBase(unittest.TestCase):
         self.assertEqual(left, right)
 
 
+
+
+def solve_random(n, mod, rnd, timings=None):
+    while True:
+        F = [rnd.randint(-4, 4) for _ in range(n)]
+        G = [rnd.randint(-4, 4) for _ in range(n)]
+        try:
+            f, g = ns.ntru_solve_pp(F, G, mod, timings)
+        except ValueError:
+            continue
+        return F, G, f, g
+
+
+class TestNTRUSolve(unittest.TestCase):
+    def test_field_norm_matches_conjugate_product(self):
+        rnd = random.Random(7)
+        for n in (2, 8, 64):
+            num = [rnd.randint(-50, 50) for _ in range(n)]
+            prod = ns.z_negacyclic_mul(num, ns.galois_conjugate(num))
+            self.assertEqual(ns.lift(ns.field_norm(num)), prod)
+
+    def test_xgcd_iterative_large(self):
+        a, b = 3 ** 4000 + 1, 2 ** 5000 + 7
+        g, x, y = ns._xgcd(a, b)
+        self.assertEqual(g, math.gcd(a, b))
+        self.assertEqual(a * x + b * y, g)
+
+    def test_solve_equation_holds(self):
+        rnd = random.Random(2025)
+        mod = 12289
+        for n in (2, 16, 64):
+            F, G, f, g = solve_random(n, mod, rnd)
+            lhs = ns.z_sub(ns.z_negacyclic_mul(f, G), ns.z_negacyclic_mul(g, F))
+            self.assertEqual(lhs, [mod] + [0] * (n - 1))
+
+    def test_solve_n256_reduced_with_timings(self):
+        rnd = random.Random(256)
+        mod = 12289
+        timings = []
+        F, G, f, g = solve_random(256, mod, rnd, timings)
+        lhs = ns.z_sub(ns.z_negacyclic_mul(f, G), ns.z_negacyclic_mul(g, F))
+        self.assertEqual(lhs, [mod] + [0] * 255)
+        self.assertLess(max(abs(x) for x in f + g), mod)
+        self.assertEqual([lvl for lvl, _ in timings[-9:]], [1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.assertTrue(all(t >= 0 for _, t in timings))
+
+    def test_babai_reduce_strips_large_multiple(self):
+        rnd = random.Random(18)
+        n = 64
+        F = [rnd.randint(-4, 4) for _ in range(n)]
+        G = [rnd.randint(-4, 4) for _ in range(n)]
+        k = [rnd.randint(-(1 << 600), 1 << 600) for _ in range(n)]
+        f = ns.z_add(ns.z_negacyclic_mul(k, F), rand_vec(n, -3, 3))
+        g = ns.z_add(ns.z_negacyclic_mul(k, G), rand_vec(n, -3, 3))
+        fr, gr = ns.babai_reduce(F, G, f, g)
+        H = ns.z_sub(ns.z_negacyclic_mul(f, G), ns.z_negacyclic_mul(g, F))
+        Hr = ns.z_sub(ns.z_negacyclic_mul(fr, G), ns.z_negacyclic_mul(gr, F))
+        self.assertEqual(H, Hr)
+        self.assertLess(max(abs(x) for x in fr + gr), 1 << 10)
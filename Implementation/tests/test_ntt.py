@@ -3,6 +3,11 @@ import random
 import ntt
 from poly import Poly
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 Q_SMALL, D_SMALL = 769, 8
 Q_MED,  D_MED = 12289, 256
@@ -106,3 +111,105 @@ class TestNTT(unittest.TestCase):
         b = rand_vec(deg, mod)
         c = ntt.poly_mul_rq_ntt(a, b, mod, deg)
         self.assertEqual(len(c), deg)
+
+    def test_plan_registry_reuses_plans(self):
+        ntt.ntt_plan_cache_clear()
+        p1 = ntt.get_ntt_plan(Q_SMALL, D_SMALL)
+        p2 = ntt.get_ntt_plan(Q_SMALL, D_SMALL)
+        self.assertIs(p1, p2)
+        info = ntt.ntt_plan_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+        a = rand_vec(D_SMALL, Q_SMALL)
+        b = rand_vec(D_SMALL, Q_SMALL)
+        ntt.poly_mul_rq_ntt(a, b, Q_SMALL, D_SMALL)
+        self.assertEqual(ntt.ntt_plan_cache_info().hits, 2)
+
+    def test_plan_registry_lru_eviction(self):
+        ntt.ntt_plan_cache_clear()
+        ntt.set_ntt_plan_cache_capacity(2)
+        try:
+            p_small = ntt.get_ntt_plan(Q_SMALL, D_SMALL)
+            ntt.get_ntt_plan(Q_MED, 16)
+            ntt.get_ntt_plan(Q_MED, 32)
+            self.assertEqual(ntt.ntt_plan_cache_info().size, 2)
+            self.assertIsNot(ntt.get_ntt_plan(Q_SMALL, D_SMALL), p_small)
+        finally:
+            ntt.set_ntt_plan_cache_capacity(8)
+            ntt.ntt_plan_cache_clear()
+
+    def test_ct_gs_matches_poly_mul_rq_ntt(self):
+        for mod, deg in ((Q_SMALL, D_SMALL), (Q_MED, 2), (Q_MED, D_MED), (Q_LARGE, D_LARGE)):
+            plan = ntt.get_ntt_plan(mod, deg)
+            for _ in range(3):
+                a = rand_vec(deg, mod)
+                b = rand_vec(deg, mod)
+                self.assertEqual(ntt.negacyclic_convolution_plan(a, b, plan),
+                                 ntt.poly_mul_rq_ntt(a, b, mod, deg))
+
+    def test_ct_gs_roundtrip_and_evaluation_points(self):
+        mod, deg = Q_SMALL, D_SMALL
+        plan = ntt.get_ntt_plan(mod, deg)
+        a = rand_vec(deg, mod)
+        A = ntt.negacyclic_ntt(a, plan)
+        self.assertEqual(ntt.negacyclic_intt(A, plan), a)
+        for i in range(deg):
+            x = pow(plan.psi, 2 * plan.bitrev[i] + 1, mod)
+            self.assertEqual(A[i], sum(c * pow(x, j, mod) for j, c in enumerate(a)) % mod)
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class TestNTTNumpy(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        random.seed(2026)
+
+    def test_layers_match_list_implementation(self):
+        for mod, deg in ((Q_SMALL, D_SMALL), (Q_MED, D_MED), (Q_LARGE, D_LARGE)):
+            plan = ntt.get_ntt_plan(mod, deg)
+            a = rand_vec(deg, mod)
+            A_ref = ntt.ntt(a, mod, plan.roots, plan.bitrev)
+            A = ntt.ntt_np(a, plan)
+            self.assertEqual(A.tolist(), A_ref)
+            self.assertEqual(ntt.intt_np(A, plan).tolist(), ntt.intt(A_ref, mod, plan.roots_inv, plan.bitrev))
+            self.assertEqual(ntt.intt_np(A, plan).tolist(), a)
+
+    def test_negacyclic_convolution_np(self):
+        for mod, deg in ((Q_SMALL, D_SMALL), (Q_MED, D_MED), (Q_LARGE, D_LARGE)):
+            plan = ntt.get_ntt_plan(mod, deg)
+            a = rand_vec(deg, mod)
+            b = rand_vec(deg, mod)
+            got = ntt.negacyclic_convolution_np(a, b, plan)
+            self.assertEqual(got.tolist(), ntt.poly_mul_rq_ntt(a, b, mod, deg))
+
+    def test_non_lazy_path_for_large_prime(self):
+        mod, deg = 2013265921, 64
+        plan = ntt.get_ntt_plan(mod, deg)
+        self.assertFalse(ntt._np_tables(plan)["lazy"])
+        a = rand_vec(deg, mod)
+        b = rand_vec(deg, mod)
+        self.assertEqual(ntt.negacyclic_convolution_np(a, b, plan).tolist(),
+                         ntt.poly_mul_rq_ntt(a, b, mod, deg))
+
+    def test_batch_transforms_match_rows(self):
+        mod, deg = Q_MED, D_MED
+        plan = ntt.get_ntt_plan(mod, deg)
+        M = np.array([rand_vec(deg, mod) for _ in range(5)])
+        hat = ntt.ntt_batch(M, plan, negacyclic=False)
+        for i in range(5):
+            self.assertEqual(hat[i].tolist(), ntt.ntt(M[i].tolist(), mod, plan.roots, plan.bitrev))
+        self.assertEqual(ntt.intt_batch(hat, plan, negacyclic=False).tolist(), M.tolist())
+        self.assertEqual(ntt.intt_batch(ntt.ntt_batch(M, plan), plan).tolist(), M.tolist())
+
+    def test_batched_matvec_mac(self):
+        mod, deg, k = Q_MED, 64, 3
+        plan = ntt.get_ntt_plan(mod, deg)
+        A = np.array([[rand_vec(deg, mod) for _ in range(k)] for _ in range(k)])
+        s = np.array([rand_vec(deg, mod) for _ in range(k)])
+        t = ntt.intt_batch(ntt.pointwise_mac_batch(ntt.ntt_batch(A, plan), ntt.ntt_batch(s, plan), mod), plan)
+        for i in range(k):
+            ref = [0] * deg
+            for j in range(k):
+                prod = ntt.poly_mul_rq_ntt(A[i, j].tolist(), s[j].tolist(), mod, deg)
+                ref = [(x + y) % mod for x, y in zip(ref, prod)]
+            self.assertEqual(t[i].tolist(), ref)
@@ -1,7 +1,14 @@
 import unittest
 import random
 
-from poly import Poly
+from modular import NonInvertibleError
+import ntt
+from poly import Poly, PolyNTT, poly_inverse_mod_q
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 PRIME_61 = (1 << 61) - 1
 PRIME_127 = (1 << 127) - 1
@@ -125,3 +132,151 @@ class TestPoly(unittest.TestCase):
         g = rand_poly(deg, mod)
         h = f * g
         self.assertEqual(len(h.to_list()), deg)
+
+    def test_mul_ntt_ring_matches_reference(self):
+        for mod, deg in ((769, 8), (12289, 64), (12289, 256)):
+            Poly.ring(mod, deg)
+            self.assertIsNotNone(Poly._ntt)
+            for _ in range(5):
+                f = rand_poly(deg, mod)
+                g = rand_poly(deg, mod)
+                ref = ref_mul(f.to_list(), g.to_list(), mod, deg)
+                self.assertEqual((f * g).to_list(), ref)
+                self.assertEqual(f._mul_poly(g).to_list(), ref)
+
+    def test_mul_non_ntt_ring_falls_back(self):
+        mod, deg = 12289, 12
+        Poly.ring(mod, deg)
+        self.assertIsNone(Poly._ntt)
+        f = rand_poly(deg, mod)
+        g = rand_poly(deg, mod)
+        self.assertEqual((f * g).to_list(), ref_mul(f.to_list(), g.to_list(), mod, deg))
+
+    def test_poly_ntt_domain_ops_match_coefficient_ops(self):
+        mod, deg = 12289, 64
+        Poly.ring(mod, deg)
+        f, g, h = rand_poly(deg, mod), rand_poly(deg, mod), rand_poly(deg, mod)
+        fh, gh = f.to_ntt(), g.to_ntt()
+        self.assertIsInstance(fh, PolyNTT)
+        self.assertEqual(fh.to_list(), f.to_list())
+        self.assertEqual((fh * gh).to_list(), (f * g).to_list())
+        self.assertEqual((fh + gh).to_list(), (f + g).to_list())
+        self.assertEqual((fh - gh).to_list(), (f - g).to_list())
+        self.assertEqual((-fh).to_list(), (-f).to_list())
+        self.assertEqual((fh * 7).to_list(), (f * 7).to_list())
+        self.assertEqual((fh * h).to_list(), (f * h).to_list())
+        self.assertEqual((h * fh).to_list(), (h * f).to_list())
+        self.assertEqual((fh + h).to_list(), (f + h).to_list())
+        self.assertEqual(fh._mul_poly(gh).to_poly(), f * g)
+
+    def test_poly_ntt_lazy_inverse(self):
+        mod, deg = 12289, 32
+        Poly.ring(mod, deg)
+        f = rand_poly(deg, mod)
+        prod = f.to_ntt() * f.to_ntt()
+        self.assertIsNone(prod._coeffs)
+        self.assertEqual(prod.a, (f * f).a)
+        self.assertIsNotNone(prod._coeffs)
+
+    def test_poly_ntt_accepts_equal_plans(self):
+        mod, deg = 12289, 32
+        Poly.ring(mod, deg)
+        f, g = rand_poly(deg, mod), rand_poly(deg, mod)
+        fh = f.to_ntt()
+        ntt.ntt_plan_cache_clear()
+        Poly._mod = None
+        Poly.ring(mod, deg)
+        gh = g.to_ntt()
+        self.assertIsNot(fh._plan, gh._plan)
+        self.assertEqual((fh * gh).to_list(), (f * g).to_list())
+        self.assertEqual((fh + gh).to_list(), (f + g).to_list())
+
+    def test_to_ntt_without_ntt_ring_is_identity(self):
+        mod, deg = PRIME_61, 16
+        Poly.ring(mod, deg)
+        f = rand_poly(deg, mod)
+        self.assertIs(f.to_ntt(), f)
+        with self.assertRaises(RuntimeError):
+            PolyNTT([0] * deg)
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class TestPolyNumpyBackend(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        random.seed(2026)
+
+    def setUp(self):
+        Poly.set_backend("numpy")
+
+    def tearDown(self):
+        Poly.set_backend("list")
+
+    def test_array_storage_and_list_view(self):
+        mod, deg = 12289, 64
+        Poly.ring(mod, deg)
+        self.assertEqual(Poly.backend(), "numpy")
+        f = Poly.from_list([-1, mod + 5] + [0] * (deg - 2))
+        self.assertIsInstance(f._c, np.ndarray)
+        self.assertEqual(f._c.dtype, np.int64)
+        self.assertEqual(f.to_list()[:2], [mod - 1, 5])
+        self.assertTrue(all(isinstance(x, int) for x in f.a))
+
+    def test_vectorized_ops_match_list_backend(self):
+        mod, deg = 12289, 64
+        Poly.ring(mod, deg)
+        fl = [random.randrange(mod) for _ in range(deg)]
+        gl = [random.randrange(mod) for _ in range(deg)]
+        c = random.randrange(mod)
+
+        f, g = Poly.from_list(fl), Poly.from_list(gl)
+        got = [(f + g).a, (f - g).a, (-f).a, (c * f).a, (f * g).a]
+
+        Poly.set_backend("list")
+        f, g = Poly.from_list(fl), Poly.from_list(gl)
+        ref = [(f + g).a, (f - g).a, (-f).a, (c * f).a, (f * g).a]
+        self.assertEqual(got, ref)
+
+    def test_large_modulus_falls_back_to_lists(self):
+        Poly.ring(PRIME_61, 16)
+        self.assertEqual(Poly.backend(), "list")
+        f = rand_poly(16, PRIME_61)
+        self.assertIsInstance(f._c, list)
+        self.assertEqual((f - f).to_list(), Poly.zero().to_list())
+
+
+@unittest.skipUnless(np is None, "numpy is installed")
+class TestPolyNumpyBackendMissing(unittest.TestCase):
+    def test_set_backend_without_numpy_raises(self):
+        with self.assertRaises(RuntimeError):
+            Poly.set_backend("numpy")
+        self.assertEqual(Poly.backend(), "list")
+
+
+class TestPolyInverse(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        random.seed(77)
+
+    def test_inverse_mod_q(self):
+        mod, deg = 12289, 64
+        Poly.ring(mod, deg)
+        f = rand_poly(deg, mod)
+        f_inv = poly_inverse_mod_q(f)
+        self.assertEqual((f * f_inv).to_list(), Poly.one().to_list())
+        self.assertEqual((f.to_ntt().inverse() * f).to_list(), Poly.one().to_list())
+
+    def test_non_invertible_raises_with_indices(self):
+        mod, deg = 12289, 16
+        Poly.ring(mod, deg)
+        f = Poly.from_list([-Poly._ntt.psi, 1])
+        with self.assertRaises(NonInvertibleError) as ctx:
+            poly_inverse_mod_q(f)
+        self.assertEqual(len(ctx.exception.indices), 1)
+        with self.assertRaises(NonInvertibleError):
+            poly_inverse_mod_q(Poly.zero())
+
+    def test_requires_ntt_ring(self):
+        Poly.ring(PRIME_61, 16)
+        with self.assertRaises(RuntimeError):
+            poly_inverse_mod_q(Poly.one())
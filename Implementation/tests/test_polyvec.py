@@ -0,0 +1,174 @@
+import unittest
+import random
+
+import algoritm_solmae
+import ntt
+import params
+import polyvec
+import samplers
+from poly import Poly, PolyNTT
+from polyvec import PolyVec, PolyMatrix
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def rand_poly(deg, mod):
+    return Poly.from_list([random.randrange(mod) for _ in range(deg)])
+
+
+def naive_matvec(A, s):
+    out = []
+    for row in A:
+        acc = Poly.zero()
+        for a, b in zip(row, s):
+            acc = acc + a._mul_schoolbook(b)
+        out.append(acc)
+    return out
+
+
+class TestPolyVecMatrix(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        random.seed(2025)
+
+    def _check_matvec(self, mod, deg, k):
+        Poly.ring(mod, deg)
+        A = [[rand_poly(deg, mod) for _ in range(k)] for _ in range(k)]
+        s = [rand_poly(deg, mod) for _ in range(k)]
+        ref = [p.to_list() for p in naive_matvec(A, s)]
+
+        got = PolyMatrix(A).matvec(PolyVec(s))
+        self.assertEqual(got.to_lists(), ref)
+
+        got_ntt = PolyMatrix(A).to_ntt().matvec(PolyVec(s).to_ntt())
+        self.assertEqual(got_ntt.to_lists(), ref)
+        return got_ntt
+
+    def test_matvec_ntt_ring(self):
+        got = self._check_matvec(12289, 64, 4)
+        self.assertTrue(all(isinstance(p, PolyNTT) for p in got))
+
+    def test_matvec_schoolbook_ring(self):
+        got = self._check_matvec(12289, 12, 3)
+        self.assertFalse(any(isinstance(p, PolyNTT) for p in got))
+
+    def test_matvec_many_matches_matvec(self):
+        mod, deg, k = 12289, 32, 3
+        Poly.ring(mod, deg)
+        M = PolyMatrix([rand_poly(deg, mod) for _ in range(k)] for _ in range(k)).to_ntt()
+        vecs = [PolyVec(rand_poly(deg, mod) for _ in range(k)) for _ in range(3)]
+        got = [v.to_lists() for v in M.matvec_many(vecs)]
+        self.assertEqual(got, [M.matvec(v).to_lists() for v in vecs])
+        with self.assertRaises(ValueError):
+            M.matvec_many([PolyVec([rand_poly(deg, mod)])])
+
+    def test_vec_add_sub_dot(self):
+        mod, deg, k = 12289, 32, 3
+        Poly.ring(mod, deg)
+        u = PolyVec(rand_poly(deg, mod) for _ in range(k))
+        v = PolyVec(rand_poly(deg, mod) for _ in range(k))
+
+        self.assertEqual((u + v).to_lists(), [(a + b).to_list() for a, b in zip(u, v)])
+        self.assertEqual((u - v).to_lists(), [(a - b).to_list() for a, b in zip(u, v)])
+        self.assertEqual((u - u).to_lists(), PolyVec.zero(k).to_lists())
+
+        ref = Poly.zero()
+        for a, b in zip(u, v):
+            ref = ref + a * b
+        self.assertEqual(u.dot(v).to_list(), ref.to_list())
+
+    def test_shape_checks(self):
+        Poly.ring(12289, 16)
+        M = PolyMatrix([[Poly.one(), Poly.zero()]])
+        self.assertEqual(M.shape, (1, 2))
+        with self.assertRaises(ValueError):
+            M.matvec(PolyVec([Poly.one()]))
+        with self.assertRaises(ValueError):
+            PolyMatrix([[Poly.one()], [Poly.one(), Poly.one()]])
+
+
+class TestMatrixCache(unittest.TestCase):
+    def setUp(self):
+        polyvec.matrix_cache_clear()
+
+    def tearDown(self):
+        polyvec.set_matrix_cache_capacity(16)
+        polyvec.matrix_cache_clear()
+
+    def test_expand_matrix_A_cached_per_rho(self):
+        rho = bytes(range(32))
+        A1 = algoritm_solmae._expand_matrix_A(rho)
+        A2 = algoritm_solmae._expand_matrix_A(rho)
+        self.assertIs(A1, A2)
+        self.assertTrue(all(isinstance(p, PolyNTT) for row in A1 for p in row))
+        info = polyvec.matrix_cache_info()
+        self.assertEqual((info.hits, info.misses, info.size), (1, 1, 1))
+
+        ref = algoritm_solmae._build_matrix_A(rho)
+        self.assertEqual([[p.to_list() for p in r] for r in A1],
+                         [[p.to_list() for p in r] for r in ref])
+
+    def test_samplers_expand_matrix_shares_cache(self):
+        Poly.ring(params.q, params.n)
+        rho = b"\x01" * 32
+        A = samplers.expand_matrix(rho)
+        self.assertIs(samplers.expand_matrix(rho), A)
+        self.assertIsNot(algoritm_solmae._expand_matrix_A(rho), A)
+        self.assertEqual(polyvec.matrix_cache_info().size, 2)
+
+    def test_capacity_and_eviction(self):
+        polyvec.set_matrix_cache_capacity(1)
+        A1 = algoritm_solmae._expand_matrix_A(b"\x00" * 32)
+        algoritm_solmae._expand_matrix_A(b"\x02" * 32)
+        self.assertEqual(polyvec.matrix_cache_info().size, 1)
+        self.assertIsNot(algoritm_solmae._expand_matrix_A(b"\x00" * 32), A1)
+
+    def test_rebinds_after_plan_eviction(self):
+        Poly.ring(params.q, params.n)
+        rho = bytes(range(32))
+        A1 = algoritm_solmae._expand_matrix_A(rho)
+        ntt.ntt_plan_cache_clear()
+        Poly._mod = None
+        Poly.ring(params.q, params.n)
+        A2 = algoritm_solmae._expand_matrix_A(rho)
+        self.assertIsNot(A1, A2)
+        self.assertTrue(all(p._plan is Poly._ntt for row in A2 for p in row))
+        self.assertIs(algoritm_solmae._expand_matrix_A(rho), A2)
+        self.assertEqual([[p.to_list() for p in r] for r in A2],
+                         [[p.to_list() for p in r] for r in A1])
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class TestPolyMatrixNumpy(unittest.TestCase):
+    def setUp(self):
+        Poly.set_backend("numpy")
+
+    def tearDown(self):
+        Poly.set_backend("list")
+
+    def test_matvec_numpy_matches_list(self):
+        mod, deg, k = 12289, 64, 4
+        Poly.ring(mod, deg)
+        rows = [[[random.randrange(mod) for _ in range(deg)] for _ in range(k)] for _ in range(k)]
+        vec = [[random.randrange(mod) for _ in range(deg)] for _ in range(k)]
+
+        M = PolyMatrix([Poly.from_list(c) for c in r] for r in rows)
+        got = M.matvec(PolyVec(Poly.from_list(c) for c in vec)).to_lists()
+        self.assertIsNotNone(M._np_hat)
+
+        Poly.set_backend("list")
+        M = PolyMatrix([Poly.from_list(c) for c in r] for r in rows)
+        ref = M.matvec(PolyVec(Poly.from_list(c) for c in vec)).to_lists()
+        self.assertEqual(got, ref)
+
+    def test_matvec_many_matches_matvec(self):
+        mod, deg, k = 12289, 64, 3
+        Poly.ring(mod, deg)
+        M = PolyMatrix([rand_poly(deg, mod) for _ in range(k)] for _ in range(k)).to_ntt()
+        vecs = [PolyVec(rand_poly(deg, mod) for _ in range(k)) for _ in range(5)]
+        got = [v.to_lists() for v in M.matvec_many(vecs)]
+        self.assertEqual(got, [M.matvec(v).to_lists() for v in vecs])
+        self.assertEqual(M.matvec_many([]), [])
@@ -0,0 +1,77 @@
+import unittest
+import random
+
+import rns
+import ntrusolve as ns
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def rand_vec(rnd, n, bits):
+    return [rnd.randint(-(1 << bits), 1 << bits) for _ in range(n)]
+
+
+class TestRNSPrimes(unittest.TestCase):
+    def test_primes_are_ntt_friendly_and_distinct(self):
+        primes = rns.ntt_primes(512, 6)
+        self.assertEqual(len(set(primes)), 6)
+        for p in primes:
+            self.assertTrue(rns.is_prime(p))
+            self.assertEqual((p - 1) % 1024, 0)
+            self.assertLess(p, 1 << rns.RNS_PRIME_BITS)
+
+    def test_is_prime_small_and_composite(self):
+        self.assertEqual([x for x in range(30) if rns.is_prime(x)], [2, 3, 5, 7, 11, 13, 17, 19, 23, 29])
+        self.assertFalse(rns.is_prime(12289 * 40961))
+        self.assertTrue(rns.is_prime(2 ** 31 - 1))
+
+    def test_basis_covers_requested_bits_and_is_cached(self):
+        rns.rns_basis_cache_clear()
+        b1 = rns.rns_basis(64, 200)
+        b2 = rns.rns_basis(64, 190)
+        self.assertIs(b1, b2)
+        self.assertGreaterEqual(b1.bits, 200)
+        self.assertEqual(rns.rns_basis_cache_info().hits, 1)
+
+
+class TestRNSPoly(unittest.TestCase):
+    def test_roundtrip_centered(self):
+        rnd = random.Random(19)
+        basis = rns.rns_basis(16, 120)
+        num = rand_vec(rnd, 16, 120)
+        self.assertEqual(rns.RNSPoly.from_ints(num, basis, use_np=False).to_ints(), num)
+
+    def test_add_sub_mul_match_integer_ring(self):
+        rnd = random.Random(20)
+        n = 32
+        num1, num2 = rand_vec(rnd, n, 90), rand_vec(rnd, n, 90)
+        basis = rns.rns_basis(n, 200)
+        a = rns.RNSPoly.from_ints(num1, basis, use_np=False)
+        b = rns.RNSPoly.from_ints(num2, basis, use_np=False)
+        self.assertEqual((a + b).to_ints(), ns.z_add(num1, num2))
+        self.assertEqual((a - b).to_ints(), ns.z_sub(num1, num2))
+        self.assertEqual((a * b).to_ints(), ns.z_negacyclic_mul(num1, num2))
+
+    def test_mixed_basis_rejected(self):
+        a = rns.RNSPoly.from_ints([1] * 8, rns.rns_basis(8, 40), use_np=False)
+        b = rns.RNSPoly.from_ints([1] * 8, rns.rns_basis(8, 400), use_np=False)
+        with self.assertRaises(TypeError):
+            a * b
+
+    def test_negacyclic_mul_matches_kronecker(self):
+        rnd = random.Random(21)
+        for n, bits in ((1, 10), (8, 3), (64, 300), (256, 40)):
+            num1, num2 = rand_vec(rnd, n, bits), rand_vec(rnd, n, bits)
+            self.assertEqual(rns.rns_negacyclic_mul(num1, num2, use_np=False), ns.z_negacyclic_mul(num1, num2))
+
+    @unittest.skipUnless(np is not None, "numpy is not installed")
+    def test_numpy_backend_matches_list(self):
+        rnd = random.Random(22)
+        n = 128
+        num1, num2 = rand_vec(rnd, n, 200), rand_vec(rnd, n, 200)
+        self.assertEqual(rns.rns_negacyclic_mul(num1, num2, use_np=True),
+                         rns.rns_negacyclic_mul(num1, num2, use_np=False))
+
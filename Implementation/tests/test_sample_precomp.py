@@ -29,6 +29,12 @@ class TestNTTPlan(unittest.TestCase):
             rinv = plan.roots_inv[i]
             self.assertEqual((r * rinv) % self.Q, 1)
 
+    def test_make_ntt_plan_shared_with_registry(self):
+        import ntt
+        plan = sp.make_ntt_plan(self.Q, self.N)
+        self.assertIs(plan, ntt.get_ntt_plan(self.Q, self.N))
+        self.assertIs(plan, sp.make_ntt_plan(self.Q, self.N))
+
     def test_precompute_for_sample_flags(self):
         params = sp.SampleParams(n=self.N, q=self.Q, sigma=3.0, use_ntt=True, use_fft=False)
         state = sp.precompute_for_sample(params)
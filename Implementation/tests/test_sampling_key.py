@@ -0,0 +1,73 @@
+import unittest
+import math
+
+import ntrugen
+import samplers
+import sampling_key as skm
+
+
+Q = 12289
+
+
+def tree_leaves(tree):
+    _, left, right = tree
+    if isinstance(left, float):
+        return [left, right]
+    return tree_leaves(left) + tree_leaves(right)
+
+
+class DummyParams:
+    def __init__(self, eta):
+        self.eta = eta
+
+
+class TestSamplingKey(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.n = 32
+        cls.eta = 1.5
+        cls.basis = ntrugen.ntru_keygen(deg=cls.n)
+        cls.sk = skm.expand_sampling_key(*cls.basis, eta=cls.eta)
+
+    def test_gram_schmidt_fields(self):
+        sk = self.sk
+        self.assertEqual(sk.d, self.n // 2)
+        ortho = skm._inner_fft(sk.b2_tilde_fft, sk.b1_fft)
+        self.assertLess(max(abs(x) for x in ortho), 1e-6)
+        for s1, s2 in zip(skm._sq_norm_fft(sk.b1_fft), skm._sq_norm_fft(sk.b2_tilde_fft)):
+            self.assertAlmostEqual(s1 * s2 / (Q * Q), 1.0, places=9)
+
+    def test_projections_and_sigmas(self):
+        sk = self.sk
+        for b, beta in ((sk.b1_fft, sk.beta1_fft), (sk.b2_tilde_fft, sk.beta2_fft)):
+            proj = [x * a + y * c for x, y, a, c in zip(b[0], b[1], beta[0], beta[1])]
+            self.assertLess(max(abs(p - 1) for p in proj), 1e-9)
+        for Sigma, b in ((sk.Sigma1_fft, sk.b1_fft), (sk.Sigma2_fft, sk.b2_tilde_fft)):
+            for s, nb in zip(Sigma, skm._sq_norm_fft(b)):
+                self.assertAlmostEqual((s * s + self.eta ** 2) * nb, sk.sigma ** 2, delta=1e-6 * sk.sigma ** 2)
+
+    def test_ffldl_tree_matches_determinant(self):
+        leaves = tree_leaves(self.sk.tree)
+        self.assertEqual(len(leaves), self.n)
+        log_det = sum(math.log((self.sk.sigma / s) ** 2) for s in leaves)
+        self.assertAlmostEqual(log_det, self.n * math.log(Q), places=6)
+
+    def test_serialization_roundtrip(self):
+        data = self.sk.to_bytes()
+        self.assertEqual(skm.SamplingKey.from_bytes(data), self.sk)
+        with self.assertRaises(ValueError):
+            skm.SamplingKey.from_bytes(b"XXXX" + data[4:])
+        for bad in (data + bytes(8), data[:-8], data[:-1], data[:40], data[:10], b""):
+            with self.assertRaises(ValueError):
+                skm.SamplingKey.from_bytes(bad)
+
+    def test_sigma_too_small_rejected(self):
+        with self.assertRaises(ValueError):
+            skm.expand_sampling_key(*self.basis, eta=self.eta, sigma=1.0)
+
+    def test_sampler_accepts_expanded_key(self):
+        d = self.sk.d
+        c_fft = ([0j] * d, [0j] * d)
+        v1, v2 = samplers.sample(c_fft, self.sk, DummyParams(self.eta))
+        self.assertEqual((len(v1), len(v2)), (d, d))
+        self.assertTrue(all(isinstance(x, complex) for x in v1 + v2))